@@ -7,6 +7,9 @@ from langchain.prompts import PromptTemplate
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from cypher_cache import CypherCache, CachedCypherQA
+from cypher_templates import QueryRouter
+from schema_snapshot import SchemaStore
 
 load_dotenv()
 NEO4J_CONFIG = {
@@ -104,6 +107,11 @@ with st.sidebar:
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+@st.cache_resource
+def get_query_cache():
+    # One cache per server process, shared by every Streamlit session
+    return CypherCache()
+
 @st.cache_resource
 def init_chain():
     llm = ChatGroq(
@@ -112,7 +120,9 @@ def init_chain():
         temperature=0.1
     )
     
-    kg = Neo4jGraph(**NEO4J_CONFIG)
+    # Schema comes from the snapshot written after ingest, not from APOC introspection
+    kg = Neo4jGraph(**NEO4J_CONFIG, refresh_schema=False)
+    schema_store = SchemaStore(run_query=kg.query)
     
     cypher_template = """You are an expert at generating Neo4j Cypher queries for AI text detection analysis.
 
@@ -157,14 +167,15 @@ Provide a comprehensive analysis including:
 
 Format your response with clear sections and bullet points for readability."""
 
-    return GraphCypherQAChain.from_llm(
+    chain = GraphCypherQAChain.from_llm(
         llm,
         graph=kg,
         cypher_prompt=PromptTemplate.from_template(cypher_template),
         qa_prompt=PromptTemplate.from_template(qa_template),
         verbose=True,
         allow_dangerous_requests=True
-    ), kg.get_schema
+    )
+    return QueryRouter(CachedCypherQA.from_chain(chain, get_query_cache(), schema=schema_store.get))
 
 col1, col2 = st.columns([2, 1])
 
@@ -172,17 +183,21 @@ with col1:
     st.header("💬 Ask About AI Detection Patterns")
     
     try:
-        chain, schema = init_chain()
+        chain = init_chain()
         st.success("Connected to AI-GA dataset")
     except Exception as e:
         st.error(f"Database connection failed: {e}")
-        chain, schema = None, None
+        chain = None
 
     for msg in st.session_state.messages:
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
 
-    if prompt := st.chat_input("Ask about AI text detection patterns..."):
+    prompt = st.chat_input("Ask about AI text detection patterns...")
+    if not prompt:
+        prompt = st.session_state.pop("pending_query", None)
+
+    if prompt:
         st.session_state.messages.append({"role": "user", "content": prompt})
         
         with st.chat_message("user"):
@@ -191,16 +206,33 @@ with col1:
         with st.chat_message("assistant"):
             if chain:
                 try:
-                    with st.spinner("Analyzing AI detection patterns..."):
-                        response = chain.invoke({"query": prompt, "question": prompt, "schema": schema})
-                        answer = response.get('result', 'No results found.')
-                        
-                        if 'intermediate_steps' in response and response['intermediate_steps']:
-                            with st.expander("🔍 View Generated Query"):
-                                st.code(response['intermediate_steps'][0]['query'], language="cypher")
-                        
+                    with st.status("Analyzing AI detection patterns...") as status:
+                        response = chain.retrieve(prompt)
+                        timings = response['timings']
+                        status.update(
+                            label=f"Cypher: {timings['cypher'] * 1000:.0f} ms | Retrieval: {timings['retrieval'] * 1000:.0f} ms",
+                            state="complete"
+                        )
+
+                    if 'intermediate_steps' in response and response['intermediate_steps']:
+                        with st.expander("🔍 View Generated Query"):
+                            st.code(response['intermediate_steps'][0]['query'], language="cypher")
+                            cache_info = response.get('cache', {})
+                            if response.get('path') == 'template':
+                                st.caption(f"Template: {response['intent']} | "
+                                           f"Result cache: {'hit' if cache_info.get('rows_hit') else 'miss'}")
+                            else:
+                                st.caption(f"Cypher cache: {'hit' if cache_info.get('cypher_hit') else 'miss'} | "
+                                           f"Result cache: {'hit' if cache_info.get('rows_hit') else 'miss'}")
+
+                    if 'result' in response:
+                        answer = response['result']
                         st.markdown(answer)
-                        st.session_state.messages.append({"role": "assistant", "content": answer})
+                    else:
+                        answer = st.write_stream(chain.stream_answer(prompt, response))
+                        if 'first_token' in timings:
+                            st.caption(f"First token after {timings['first_token'] * 1000:.0f} ms")
+                    st.session_state.messages.append({"role": "assistant", "content": answer})
                         
                 except Exception as e:
                     error_msg = f"Error analyzing query: {str(e)}"
@@ -223,7 +255,7 @@ with col2:
     
     for query in quick_queries:
         if st.button(query, use_container_width=True, key=query):
-            st.session_state.messages.append({"role": "user", "content": query})
+            st.session_state.pending_query = query
             st.rerun()
     
     st.markdown("---")
@@ -247,6 +279,21 @@ with col2:
     except:
         st.info("Connect to database to see stats")
     
+    st.markdown("---")
+    st.subheader("⚡ Query Cache")
+    cache_stats = get_query_cache().stats()
+    cache_col1, cache_col2 = st.columns(2)
+    cache_col1.metric("Cypher hit rate", f"{cache_stats['cypher']['hit_rate']:.0%}",
+                      help=f"{cache_stats['cypher']['hits']} hits / {cache_stats['cypher']['misses']} misses")
+    cache_col2.metric("Result hit rate", f"{cache_stats['results']['hit_rate']:.0%}",
+                      help=f"{cache_stats['results']['hits']} hits / {cache_stats['results']['misses']} misses")
+    if chain:
+        latency = chain.latency_stats()
+        for path, label in (('template', "Template path"), ('llm', "LLM path")):
+            if latency[path]['count']:
+                st.caption(f"{label}: p50 {latency[path]['p50'] * 1000:.0f} ms | "
+                           f"p95 {latency[path]['p95'] * 1000:.0f} ms ({latency[path]['count']} queries)")
+    
     st.markdown("---")
     
     st.subheader("💡 Example Questions")
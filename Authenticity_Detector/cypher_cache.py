@@ -0,0 +1,178 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+CACHE_EPOCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".graph_cache_epoch")
+
+
+def bump_cache_epoch(path: str = CACHE_EPOCH_PATH):
+    """Signal every running chatbot that the graph contents changed"""
+    with open(path, 'w') as f:
+        f.write(str(time.time()))
+
+
+def read_cache_epoch(path: str = CACHE_EPOCH_PATH) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def normalize_question(question: str) -> str:
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!. ")
+
+
+def extract_cypher(text: str) -> str:
+    """Pull the query out of an LLM answer that may wrap it in a code fence"""
+    matches = re.findall(r"```(?:cypher)?(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    return matches[0].strip() if matches else text.strip()
+
+
+class TTLCache:
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries)
+        }
+
+
+class CypherCache:
+    """Two-level cache: normalized question -> Cypher, Cypher text -> result rows"""
+
+    def __init__(self, cypher_ttl: float = 24 * 3600, result_ttl: float = 15 * 60,
+                 max_entries: int = 1024, epoch_path: str = CACHE_EPOCH_PATH):
+        self.cypher = TTLCache(cypher_ttl, max_entries)
+        self.results = TTLCache(result_ttl, max_entries)
+        self.epoch_path = epoch_path
+        self._epoch = read_cache_epoch(epoch_path)
+
+    def _check_epoch(self):
+        epoch = read_cache_epoch(self.epoch_path)
+        if epoch != self._epoch:
+            # New data may also mean new labels/properties, so drop both levels
+            self.cypher.clear()
+            self.results.clear()
+            self._epoch = epoch
+
+    def get_cypher(self, question: str) -> Tuple[bool, Optional[str]]:
+        self._check_epoch()
+        return self.cypher.get(normalize_question(question))
+
+    def put_cypher(self, question: str, cypher: str):
+        self.cypher.set(normalize_question(question), cypher)
+
+    def get_rows(self, cypher: str, params: Optional[Dict] = None) -> Tuple[bool, Any]:
+        self._check_epoch()
+        return self.results.get(self._rows_key(cypher, params))
+
+    def put_rows(self, cypher: str, rows, params: Optional[Dict] = None):
+        self.results.set(self._rows_key(cypher, params), rows)
+
+    @staticmethod
+    def _rows_key(cypher: str, params: Optional[Dict]):
+        return (cypher.strip(), repr(sorted((params or {}).items())))
+
+    def invalidate(self):
+        self.cypher.clear()
+        self.results.clear()
+
+    def stats(self) -> Dict:
+        return {'cypher': self.cypher.stats(), 'results': self.results.stats()}
+
+
+class CachedCypherQA:
+    """GraphCypherQAChain equivalent that consults a CypherCache before the LLM and graph"""
+
+    def __init__(self, cypher_chain, graph, qa_chain, cache: CypherCache,
+                 schema: str = "", top_k: int = 10):
+        self.cypher_chain = cypher_chain
+        self.graph = graph
+        self.qa_chain = qa_chain
+        self.cache = cache
+        # Either a schema string or a zero-argument callable such as SchemaStore.get
+        self.schema = schema
+        self.top_k = top_k
+
+    @classmethod
+    def from_chain(cls, chain, cache: CypherCache, schema: Optional[str] = None):
+        return cls(
+            chain.cypher_generation_chain,
+            chain.graph,
+            chain.qa_chain,
+            cache,
+            schema=schema if schema is not None else chain.graph_schema,
+            top_k=chain.top_k
+        )
+
+    def generate_cypher(self, question: str) -> Tuple[str, bool]:
+        """Cached or freshly generated Cypher; callers store fresh Cypher only once it has run"""
+        hit, cypher = self.cache.get_cypher(question)
+        if not hit:
+            schema = self.schema() if callable(self.schema) else self.schema
+            cypher = extract_cypher(self.cypher_chain.invoke({'question': question, 'schema': schema}))
+        return cypher, hit
+
+    def fetch_rows(self, cypher: str, params: Optional[Dict] = None,
+                   limit: Optional[int] = None) -> Tuple[list, bool]:
+        hit, rows = self.cache.get_rows(cypher, params)
+        if not hit:
+            rows = self.graph.query(cypher, params or {})[:limit or self.top_k]
+            self.cache.put_rows(cypher, rows, params)
+        return rows, hit
+
+    def answer(self, question: str, rows) -> str:
+        result = self.qa_chain.invoke({'question': question, 'context': rows})
+        return result if isinstance(result, str) else result.content
+
+    def stream_answer(self, question: str, rows) -> Iterator[str]:
+        for chunk in self.qa_chain.stream({'question': question, 'context': rows}):
+            yield chunk if isinstance(chunk, str) else chunk.content
+
+    def invoke(self, question: str) -> Dict:
+        cypher, cypher_hit = self.generate_cypher(question)
+        rows, rows_hit = self.fetch_rows(cypher)
+        if not cypher_hit:
+            self.cache.put_cypher(question, cypher)
+        return {
+            'result': self.answer(question, rows),
+            'intermediate_steps': [{'query': cypher}, {'context': rows}],
+            'cache': {'cypher_hit': cypher_hit, 'rows_hit': rows_hit}
+        }
@@ -0,0 +1,273 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from cypher_cache import CachedCypherQA, normalize_question
+
+CYPHER_TEMPLATES = [
+    {
+        'intent': 'ai_vs_human_stats',
+        'title': 'AI vs human writing statistics',
+        'phrases': ['show ai vs human writing statistics'],
+        'pattern': r"(show (me )?)?(the )?ai (vs|versus) human (writing )?(statistics|stats)",
+        'cypher': """
+            MATCH (a:Abstract)
+            RETURN a.generated AS generated,
+                   count(*) AS abstracts,
+                   avg(a.ai_likelihood_score) AS avg_ai_score,
+                   avg(a.word_count) AS avg_word_count,
+                   avg(a.flesch_reading_ease) AS avg_reading_ease
+            ORDER BY generated DESC
+        """,
+        'params': {}
+    },
+    {
+        'intent': 'top_features',
+        'title': 'Top AI detection features (class averages)',
+        'phrases': ['what are the top ai detection features'],
+        'pattern': r"(what are |show (me )?)?the (top|key|most important) (ai )?detection features",
+        'cypher': """
+            MATCH (a:Abstract)
+            RETURN a.generated AS generated,
+                   avg(a.connector_density) AS connector_density,
+                   avg(a.hedging_density) AS hedging_density,
+                   avg(a.intensifier_density) AS intensifier_density,
+                   avg(a.ai_phrase_count) AS ai_phrase_count,
+                   avg(a.unique_word_ratio) AS unique_word_ratio,
+                   avg(a.avg_sentence_length) AS avg_sentence_length
+            ORDER BY generated DESC
+        """,
+        'params': {}
+    },
+    {
+        'intent': 'highest_ai_probability',
+        'title': 'Abstracts with the highest AI probability',
+        'phrases': ['find abstracts with highest ai probability'],
+        'pattern': r"(find|show|list) (me )?(the )?abstracts with (the )?highest ai (probability|likelihood|score)",
+        'cypher': """
+            MATCH (a:Abstract)
+            WHERE a.ai_likelihood_score IS NOT NULL
+            RETURN a.title AS title, a.generated AS generated, a.ai_likelihood_score AS ai_likelihood_score
+            ORDER BY a.ai_likelihood_score DESC
+            LIMIT $limit
+        """,
+        'params': {'limit': 10}
+    },
+    {
+        'intent': 'connector_comparison',
+        'title': 'Connector usage in AI vs human texts',
+        'phrases': ['compare connector usage in ai vs human texts'],
+        'pattern': r"compare (the )?connector usage (in|between) ai (vs|versus|and) human (texts|abstracts)",
+        'cypher': """
+            MATCH (a:Abstract)
+            RETURN a.generated AS generated,
+                   avg(a.connector_density) AS avg_connector_density,
+                   stDev(a.connector_density) AS std_connector_density,
+                   percentileCont(a.connector_density, 0.5) AS median_connector_density,
+                   sum(CASE WHEN a.connector_density > $threshold THEN 1 ELSE 0 END) AS high_connector_abstracts
+            ORDER BY generated DESC
+        """,
+        'params': {'threshold': 0.025}
+    },
+    {
+        'intent': 'covid_terms_distribution',
+        'title': 'COVID-19 term distribution',
+        'phrases': ['show covid-19 terms distribution'],
+        'pattern': r"(show (me )?)?(the )?covid([- ]?19)? terms? distribution",
+        'cypher': """
+            MATCH (a:Abstract)
+            RETURN a.covid_terms AS covid_terms,
+                   sum(CASE WHEN a.generated THEN 1 ELSE 0 END) AS ai_abstracts,
+                   sum(CASE WHEN a.generated THEN 0 ELSE 1 END) AS human_abstracts
+            ORDER BY covid_terms
+        """,
+        'params': {}
+    },
+    {
+        'intent': 'pattern_breakdown',
+        'title': 'Patterns by AI and human abstracts',
+        'phrases': ['which patterns indicate ai generation'],
+        'pattern': r"which patterns (indicate|signal|suggest) ai generation",
+        'cypher': """
+            MATCH (a:Abstract)-[:HAS_PATTERN]->(p:Pattern)
+            RETURN p.name AS pattern, p.type AS type,
+                   sum(CASE WHEN a.generated THEN 1 ELSE 0 END) AS ai_abstracts,
+                   sum(CASE WHEN a.generated THEN 0 ELSE 1 END) AS human_abstracts
+            ORDER BY ai_abstracts DESC
+        """,
+        'params': {}
+    },
+    {
+        'intent': 'sentence_length_differences',
+        'title': 'Sentence length differences',
+        'phrases': ['analyze sentence length differences'],
+        'pattern': r"(analyze |compare |show (me )?)(the )?sentence length differences",
+        'cypher': """
+            MATCH (a:Abstract)
+            RETURN a.generated AS generated,
+                   avg(a.avg_sentence_length) AS avg_sentence_length,
+                   stDev(a.avg_sentence_length) AS std_sentence_length,
+                   percentileCont(a.avg_sentence_length, 0.5) AS median_sentence_length,
+                   avg(a.sentence_count) AS avg_sentence_count
+            ORDER BY generated DESC
+        """,
+        'params': {}
+    }
+]
+
+
+# Rewordings each template must serve, and free-form questions that must reach the LLM chain
+ROUTING_EXAMPLES = {
+    'ai_vs_human_stats': ["Show AI vs human writing statistics", "show me the AI versus human stats",
+                          "AI vs human statistics"],
+    'top_features': ["What are the top AI detection features?", "Show me the key detection features",
+                     "the most important AI detection features"],
+    'highest_ai_probability': ["Find abstracts with highest AI probability",
+                               "List the abstracts with the highest AI score",
+                               "show me abstracts with highest ai likelihood"],
+    'connector_comparison': ["Compare connector usage in AI vs human texts",
+                             "compare the connector usage between AI and human abstracts"],
+    'covid_terms_distribution': ["Show COVID-19 terms distribution", "Show COVID 19 terms distribution",
+                                 "show me the covid19 term distribution", "covid terms distribution"],
+    'pattern_breakdown': ["Which patterns indicate AI generation?", "which patterns suggest ai generation"],
+    'sentence_length_differences': ["Analyze sentence length differences",
+                                    "Analyze the sentence length differences",
+                                    "compare the sentence length differences",
+                                    "Show me sentence length differences"],
+    None: ["What is the highest AI probability among human-written abstracts?",
+           "Show me the top features of human abstracts with more than 300 words",
+           "How does sentence length correlate with readability?",
+           "Do AI texts use more COVID terms?"]
+}
+
+
+def rows_to_markdown(rows: List[Dict]) -> str:
+    if not rows:
+        return "No results found."
+
+    def fmt(value):
+        if isinstance(value, bool):
+            return "AI" if value else "Human"
+        if isinstance(value, float):
+            return f"{value:.4f}"
+        return "" if value is None else str(value)
+
+    columns = list(rows[0].keys())
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |"
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(fmt(row.get(column)) for column in columns) + " |")
+    return "\n".join(lines)
+
+
+class QueryRouter:
+    """Serve known quick-analysis intents from fixed Cypher, fall back to the LLM chain otherwise"""
+
+    def __init__(self, qa: CachedCypherQA, templates: List[Dict] = CYPHER_TEMPLATES, window: int = 500):
+        self.qa = qa
+        self.templates = templates
+        # Patterns only cover rewordings of the whole quick query; any extra qualifier goes to the LLM
+        self._patterns = [(re.compile(t['pattern']), t) for t in templates]
+        self._phrases = {phrase: t for t in templates for phrase in t['phrases']}
+        self._latencies = {'template': deque(maxlen=window), 'llm': deque(maxlen=window)}
+        self._lock = threading.Lock()
+
+    def match(self, question: str) -> Optional[Dict]:
+        normalized = normalize_question(question)
+        if normalized in self._phrases:
+            return self._phrases[normalized]
+        for pattern, template in self._patterns:
+            if pattern.fullmatch(normalized):
+                return template
+        return None
+
+    def _record(self, path: str, started: float):
+        with self._lock:
+            self._latencies[path].append(time.perf_counter() - started)
+
+    def retrieve(self, question: str) -> Dict:
+        """Run the Cypher and retrieval stages; template answers are complete, LLM answers still need streaming"""
+        started = time.perf_counter()
+        template = self.match(question)
+
+        if template is None:
+            cypher, cypher_hit = self.qa.generate_cypher(question)
+            generated = time.perf_counter()
+            rows, rows_hit = self.qa.fetch_rows(cypher)
+            if not cypher_hit:
+                self.qa.cache.put_cypher(question, cypher)
+            return {
+                'intermediate_steps': [{'query': cypher}, {'context': rows}],
+                'cache': {'cypher_hit': cypher_hit, 'rows_hit': rows_hit},
+                'path': 'llm',
+                'timings': {
+                    'started': started,
+                    'cypher': generated - started,
+                    'retrieval': time.perf_counter() - generated
+                }
+            }
+
+        rows, rows_hit = self.qa.fetch_rows(template['cypher'], template['params'], limit=100)
+        self._record('template', started)
+        return {
+            'result': f"**{template['title']}**\n\n{rows_to_markdown(rows)}",
+            'intermediate_steps': [{'query': template['cypher'].strip()}, {'context': rows}],
+            'cache': {'cypher_hit': True, 'rows_hit': rows_hit},
+            'path': 'template',
+            'intent': template['intent'],
+            'timings': {'started': started, 'cypher': 0.0, 'retrieval': time.perf_counter() - started}
+        }
+
+    def stream_answer(self, question: str, response: Dict) -> Iterator[str]:
+        timings = response['timings']
+        rows = response['intermediate_steps'][1]['context']
+        for chunk in self.qa.stream_answer(question, rows):
+            if 'first_token' not in timings:
+                timings['first_token'] = time.perf_counter() - timings['started']
+            yield chunk
+        self._record('llm', timings['started'])
+
+    def invoke(self, question: str) -> Dict:
+        response = self.retrieve(question)
+        if 'result' not in response:
+            response['result'] = "".join(self.stream_answer(question, response))
+        return response
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        stats = {}
+        with self._lock:
+            for path, samples in self._latencies.items():
+                ordered = sorted(samples)
+                if not ordered:
+                    stats[path] = {'count': 0, 'p50': None, 'p95': None}
+                    continue
+                stats[path] = {
+                    'count': len(ordered),
+                    'p50': ordered[int(0.5 * (len(ordered) - 1))],
+                    'p95': ordered[int(0.95 * (len(ordered) - 1))]
+                }
+        return stats
+
+
+def check_routing(examples: Dict = ROUTING_EXAMPLES) -> List[str]:
+    """Route every example without a graph or LLM; returns the mismatches"""
+    router = QueryRouter(qa=None)
+    failures = []
+    for intent, questions in examples.items():
+        for question in questions:
+            template = router.match(question)
+            routed = template['intent'] if template else None
+            if routed != intent:
+                failures.append(f"{question!r}: expected {intent}, routed to {routed}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_routing()
+    for failure in failures:
+        print(failure)
+    print(f"{len(failures)} routing mismatches")
@@ -8,6 +8,9 @@ from typing import List, Dict
 import numpy as np
 import re
 import hashlib
+from feature_stats import FeatureStatsAggregator, DETECTOR_STATS_PATH, BATCH_STATS_PATH
+from cypher_cache import bump_cache_epoch
+from schema_snapshot import write_schema_snapshot
 
 load_dotenv()
 
@@ -21,6 +24,9 @@ class AIGADetectionSystem:
             password=os.getenv("NEO4J_PASSWORD"),
             database=os.getenv("NEO4J_DATABASE", "neo4j")
         )
+        # Enrichment runs LIMIT 500 at a time, so keep accumulating into the persisted stats
+        self.feature_stats = FeatureStatsAggregator.load(DETECTOR_STATS_PATH)
+        self.batch_stats = FeatureStatsAggregator.load(BATCH_STATS_PATH)
         
     def create_vector_indices(self):
         indices = [
@@ -184,6 +190,11 @@ class AIGADetectionSystem:
                 plagiarism_embedding = self.get_embedding(plagiarism_context)
                 
                 ai_score = self._calculate_enhanced_ai_likelihood_score(abstract)
+                self.feature_stats.update({
+                    **{key[2:]: value for key, value in abstract.items()
+                       if key.startswith('a.') and key not in ('a.generated', 'a.id')},
+                    'ai_likelihood_score': ai_score
+                }, bool(abstract.get('a.generated')))
                 
                 self.kg.query("""
                     MATCH (a:Abstract {id: $id})
@@ -227,6 +238,12 @@ class AIGADetectionSystem:
                 if processed % 50 == 0:
                     print(f"Processed {processed} abstracts (with plagiarism check)")
                     time.sleep(1)  
+
+        self.feature_stats.save(DETECTOR_STATS_PATH)
+        if processed:
+            # Enrichment adds PlagiarismMatch nodes and new Abstract properties
+            write_schema_snapshot(self.kg.query)
+            bump_cache_epoch()
                     
     def _build_ai_detection_context(self, abstract):
         title = abstract.get('a.title', '')
@@ -403,6 +420,7 @@ class AIGADetectionSystem:
 
     def batch_process_texts(self, texts_with_metadata: List[Dict]):
         results = []
+        labelled = 0
         
         for item in texts_with_metadata:
             text = item.get('text', '')
@@ -414,7 +432,17 @@ class AIGADetectionSystem:
             result = self.detect_ai_text(text, title)
             result['metadata'] = item
             results.append(result)
-            
+
+            # Only labelled items can feed the per-class monitoring stats
+            if 'generated' in item:
+                self.batch_stats.update({
+                    **result['features'],
+                    'ai_likelihood_score': result['ai_probability']
+                }, bool(item['generated']))
+                labelled += 1
+
+        if labelled:
+            self.batch_stats.save(BATCH_STATS_PATH)
         return results
 
     def get_detection_stats(self):
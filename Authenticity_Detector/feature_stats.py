@@ -0,0 +1,291 @@
+import json
+import math
+import os
+import random
+from typing import Dict, Iterable, List, Optional
+
+STATS_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATURE_STATS_PATH = os.path.join(STATS_DIR, "feature_stats.json")
+# Enrichment scores stored abstracts; detect_ai_text computes its own feature definitions,
+# so the two are aggregated separately rather than mixed under the same keys
+DETECTOR_STATS_PATH = os.path.join(STATS_DIR, "detector_feature_stats.json")
+BATCH_STATS_PATH = os.path.join(STATS_DIR, "batch_feature_stats.json")
+
+
+class RunningMoments:
+    """Welford running mean/variance that can be merged across workers"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def merge(self, other: "RunningMoments"):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        # Chan et al. parallel combination of two partial moments
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunningMoments":
+        moments = cls()
+        moments.n = data['n']
+        moments.mean = data['mean']
+        moments.m2 = data['m2']
+        moments.min = data['min']
+        moments.max = data['max']
+        return moments
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang, Liberty 2016)"""
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: Optional[int] = None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors: List[List[float]] = []
+        self._rng = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.compactors)
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            items = self.compactors[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 >= len(self.compactors):
+                self._grow()
+
+            items.sort()
+            leftover = [items.pop()] if len(items) % 2 else []
+            offset = self._rng.randint(0, 1)
+            self.compactors[level + 1].extend(items[offset::2])
+            self.compactors[level] = leftover
+
+            if self._size() < self._max_size:
+                break
+
+    def update(self, x: float):
+        self.n += 1
+        self.compactors[0].append(x)
+        if self._size() >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        while self._size() >= self._max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        weighted = sorted(
+            (x, 2 ** level)
+            for level, items in enumerate(self.compactors)
+            for x in items
+        )
+        qs = list(qs)
+        if not weighted:
+            return [None for _ in qs]
+
+        total = sum(w for _, w in weighted)
+        results = []
+        for q in qs:
+            target = q * total
+            cumulative = 0
+            value = weighted[-1][0]
+            for x, w in weighted:
+                cumulative += w
+                if cumulative >= target:
+                    value = x
+                    break
+            results.append(value)
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'c': self.c, 'n': self.n, 'compactors': self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KLLSketch":
+        sketch = cls(k=data['k'], c=data['c'])
+        sketch.compactors = []
+        for _ in data['compactors']:
+            sketch._grow()
+        sketch.compactors = [list(items) for items in data['compactors']]
+        sketch.n = data['n']
+        return sketch
+
+
+class FeatureStatsAggregator:
+    """Per-class streaming moments and quantiles for each linguistic feature"""
+
+    def __init__(self, sketch_k: int = 200):
+        self.sketch_k = sketch_k
+        # class key ('ai' / 'human') -> feature -> {'moments', 'sketch'}
+        self.stats: Dict[str, Dict[str, Dict]] = {}
+
+    @staticmethod
+    def _class_key(generated: bool) -> str:
+        return 'ai' if generated else 'human'
+
+    def _entry(self, class_key: str, feature: str) -> Dict:
+        features = self.stats.setdefault(class_key, {})
+        if feature not in features:
+            features[feature] = {
+                'moments': RunningMoments(),
+                'sketch': KLLSketch(k=self.sketch_k)
+            }
+        return features[feature]
+
+    def update(self, features: Dict, generated: bool):
+        class_key = self._class_key(generated)
+        for feature, value in features.items():
+            if value is None or isinstance(value, bool):
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(value):
+                continue
+
+            entry = self._entry(class_key, feature)
+            entry['moments'].update(value)
+            entry['sketch'].update(value)
+
+    def merge(self, other: "FeatureStatsAggregator"):
+        for class_key, features in other.stats.items():
+            for feature, other_entry in features.items():
+                entry = self._entry(class_key, feature)
+                entry['moments'].merge(other_entry['moments'])
+                entry['sketch'].merge(other_entry['sketch'])
+        return self
+
+    def summary(self, feature: str, generated: bool, qs=(0.5, 0.9, 0.99)) -> Optional[Dict]:
+        entry = self.stats.get(self._class_key(generated), {}).get(feature)
+        if not entry:
+            return None
+        moments = entry['moments']
+        return {
+            'count': moments.n,
+            'mean': moments.mean,
+            'std': moments.std,
+            'min': moments.min,
+            'max': moments.max,
+            'quantiles': dict(zip(qs, entry['sketch'].quantiles(qs)))
+        }
+
+    def features(self) -> List[str]:
+        return sorted({feature for features in self.stats.values() for feature in features})
+
+    def print_report(self, features: Optional[List[str]] = None):
+        print(f"\n{'='*40}")
+        print("STREAMING FEATURE STATISTICS")
+        print(f"{'='*40}")
+        for feature in features or self.features():
+            ai = self.summary(feature, True)
+            human = self.summary(feature, False)
+            print(f"{feature}:")
+            for label, stats in (('AI', ai), ('Human', human)):
+                if stats:
+                    q = stats['quantiles']
+                    print(f"  {label}: mean={stats['mean']:.4f} std={stats['std']:.4f} "
+                          f"p50={q[0.5]:.4f} p90={q[0.9]:.4f} (n={stats['count']})")
+
+    def to_dict(self) -> Dict:
+        return {
+            'sketch_k': self.sketch_k,
+            'stats': {
+                class_key: {
+                    feature: {
+                        'moments': entry['moments'].to_dict(),
+                        'sketch': entry['sketch'].to_dict()
+                    }
+                    for feature, entry in features.items()
+                }
+                for class_key, features in self.stats.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FeatureStatsAggregator":
+        aggregator = cls(sketch_k=data.get('sketch_k', 200))
+        for class_key, features in data.get('stats', {}).items():
+            for feature, entry in features.items():
+                aggregator.stats.setdefault(class_key, {})[feature] = {
+                    'moments': RunningMoments.from_dict(entry['moments']),
+                    'sketch': KLLSketch.from_dict(entry['sketch'])
+                }
+        return aggregator
+
+    def save(self, path: str = FEATURE_STATS_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = FEATURE_STATS_PATH) -> "FeatureStatsAggregator":
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def merge_feature_stats(paths: Iterable[str], output_path: str = FEATURE_STATS_PATH) -> FeatureStatsAggregator:
+    """Combine partial aggregates written by parallel workers into one file"""
+    merged = FeatureStatsAggregator()
+    for path in paths:
+        merged.merge(FeatureStatsAggregator.load(path))
+    merged.save(output_path)
+    return merged
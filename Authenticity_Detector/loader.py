@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from neo4j import GraphDatabase
+from neo4j_access import get_neo4j, close_neo4j
 from dotenv import load_dotenv
 import hashlib
 import re
@@ -11,6 +11,9 @@ from nltk.tokenize import word_tokenize, sent_tokenize
 import spacy
 import numpy as np
 from textstat import flesch_reading_ease, flesch_kincaid_grade, automated_readability_index
+from feature_stats import FeatureStatsAggregator, FEATURE_STATS_PATH, DETECTOR_STATS_PATH
+from cypher_cache import bump_cache_epoch
+from schema_snapshot import write_schema_snapshot
 
 try:
     nltk.data.find('tokenizers/punkt')
@@ -32,16 +35,15 @@ load_dotenv()
 
 class AIGALoader:
     def __init__(self):
-        self.driver = GraphDatabase.driver(
-            os.getenv("NEO4J_URI"), 
-            auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
-        )
-        self.db = os.getenv("NEO4J_DATABASE", "neo4j")
+        self.neo4j = get_neo4j(database=os.getenv("NEO4J_DATABASE", "neo4j"))
         self.stop_words = set(stopwords.words('english'))
+        self.feature_stats = FeatureStatsAggregator()
         
     def execute_query(self, query, params=None):
-        with self.driver.session(database=self.db) as session:
-            return session.run(query, params or {})
+        return self.neo4j.write(query, params)
+
+    def query_data(self, query, params=None):
+        return self.neo4j.read(query, params)
 
     def extract_ai_linguistic_features(self, text):
         """Extract linguistic features that distinguish AI from human abstracts"""
@@ -158,7 +160,7 @@ class AIGALoader:
         
         for constraint in constraints:
             try:
-                self.execute_query(constraint)
+                self.neo4j.run(constraint)
             except Exception as e:
                 print(f"Constraint might already exist: {e}")
 
@@ -179,6 +181,7 @@ class AIGALoader:
             abstract_id = f"aiga_{hashlib.md5((title + abstract[:50]).encode()).hexdigest()[:12]}"
             keywords = self.extract_keywords(abstract, title)
             features = self.extract_ai_linguistic_features(abstract)
+            self.feature_stats.update(features, label)
             
             # Create abstract node with comprehensive features
             self.execute_query("""
@@ -257,26 +260,30 @@ class AIGALoader:
             if processed % 1000 == 0:
                 print(f"Processed {processed} abstracts")
         
+        self.feature_stats.save(FEATURE_STATS_PATH)
         return processed
 
     def clear_database(self):
         print("Clearing existing data...")
-        self.execute_query("MATCH (n) DETACH DELETE n")
+        self.neo4j.run("MATCH (n) DETACH DELETE n")
+        # Every abstract gets re-enriched, so the accumulated enrichment stats start over
+        if os.path.exists(DETECTOR_STATS_PATH):
+            os.remove(DETECTOR_STATS_PATH)
 
     def show_detailed_stats(self):
         stats = {}
         
         # Basic counts
-        result = self.execute_query("MATCH (a:Abstract) RETURN count(a) as count").single()
+        result = next(iter(self.query_data("MATCH (a:Abstract) RETURN count(a) as count")), None)
         stats['total_abstracts'] = result['count'] if result else 0
         
-        result = self.execute_query("MATCH (a:Abstract {generated: true}) RETURN count(a) as count").single()
+        result = next(iter(self.query_data("MATCH (a:Abstract {generated: true}) RETURN count(a) as count")), None)
         stats['ai_abstracts'] = result['count'] if result else 0
         
-        result = self.execute_query("MATCH (k:Keyword) RETURN count(k) as count").single()
+        result = next(iter(self.query_data("MATCH (k:Keyword) RETURN count(k) as count")), None)
         stats['keywords'] = result['count'] if result else 0
         
-        result = self.execute_query("MATCH (p:Pattern) RETURN count(p) as count").single()
+        result = next(iter(self.query_data("MATCH (p:Pattern) RETURN count(p) as count")), None)
         stats['patterns'] = result['count'] if result else 0
         
         print(f"\n{'='*60}")
@@ -293,7 +300,7 @@ class AIGALoader:
         print("ENHANCED LINGUISTIC FEATURES")
         print(f"{'='*40}")
         
-        ai_features = self.execute_query("""
+        ai_features = next(iter(self.query_data("""
             MATCH (a:Abstract {generated: true})
             RETURN avg(a.avg_sentence_length) as avg_sent_len,
                    avg(a.connector_density) as avg_connectors,
@@ -301,9 +308,9 @@ class AIGALoader:
                    avg(a.unique_word_ratio) as avg_uniqueness,
                    avg(a.flesch_reading_ease) as avg_readability,
                    avg(a.ai_phrase_count) as avg_ai_phrases
-        """).single()
+        """)), None)
         
-        human_features = self.execute_query("""
+        human_features = next(iter(self.query_data("""
             MATCH (a:Abstract {generated: false})
             RETURN avg(a.avg_sentence_length) as avg_sent_len,
                    avg(a.connector_density) as avg_connectors,
@@ -311,7 +318,7 @@ class AIGALoader:
                    avg(a.unique_word_ratio) as avg_uniqueness,
                    avg(a.flesch_reading_ease) as avg_readability,
                    avg(a.ai_phrase_count) as avg_ai_phrases
-        """).single()
+        """)), None)
         
         if ai_features and human_features:
             print("Average Sentence Length:")
@@ -327,6 +334,12 @@ class AIGALoader:
             print("Reading Ease:")
             print(f"  AI: {ai_features['avg_readability']:.2f} | Human: {human_features['avg_readability']:.2f}")
 
+        if self.feature_stats.stats:
+            self.feature_stats.print_report([
+                'avg_sentence_length', 'connector_density', 'hedging_density',
+                'ai_phrase_count', 'unique_word_ratio', 'flesch_reading_ease'
+            ])
+
     def load_all_data(self, clear=True):
         if clear:
             self.clear_database()
@@ -340,10 +353,15 @@ class AIGALoader:
             print("AI-GA dataset not found at data/ai-ga-dataset.csv")
             print("Please ensure the file exists in the data directory")
             
+        write_schema_snapshot(self.query_data)
+        bump_cache_epoch()
         self.show_detailed_stats()
 
     def close(self):
-        self.driver.close()
+        pool = self.neo4j.stats()
+        print(f"Neo4j: {pool['writes']} writes, {pool['retries']} retries, "
+              f"peak pool utilization {pool['peak_pool_utilization']:.0%}")
+        close_neo4j()
 
 if __name__ == "__main__":
     loader = AIGALoader()
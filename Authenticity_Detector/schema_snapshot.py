@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+SCHEMA_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_snapshot.json")
+SNAPSHOT_LABELS = ['Abstract', 'Keyword', 'Pattern', 'PlagiarismMatch']
+
+# Vectors and long text bodies are useless to the Cypher generator and bloat the prompt
+SKIPPED_PROPERTIES = {'embedding', 'plagiarism_embedding', 'text'}
+
+
+def _value_type(value) -> str:
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'FLOAT'
+    if isinstance(value, list):
+        return 'LIST'
+    return 'STRING'
+
+
+def _sample_value(value):
+    if isinstance(value, str) and len(value) > 40:
+        return value[:40] + "..."
+    return value
+
+
+def build_schema_snapshot(run_query: Callable[[str, Dict], List[Dict]], labels: List[str] = SNAPSHOT_LABELS,
+                          sample_size: int = 100, samples_per_property: int = 3) -> Dict:
+    """Sample a bounded number of nodes per label instead of scanning the whole store"""
+    nodes = {}
+    for label in labels:
+        rows = run_query(f"""
+            MATCH (n:`{label}`)
+            WITH n LIMIT $sample_size
+            UNWIND keys(n) AS key
+            WITH key, collect(n[key]) AS values
+            RETURN key, values[..$samples] AS samples
+        """, {'sample_size': sample_size, 'samples': samples_per_property})
+
+        properties = {}
+        for row in rows:
+            if row['key'] in SKIPPED_PROPERTIES or not row['samples']:
+                continue
+            properties[row['key']] = {
+                'type': _value_type(row['samples'][0]),
+                'samples': [_sample_value(v) for v in row['samples'] if not isinstance(v, list)]
+            }
+        if properties:
+            nodes[label] = properties
+
+    # One LIMIT 1 probe per relationship type, so rare types written late (e.g. by enrichment) are never missed
+    relationships = []
+    types = run_query("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType", {})
+    for row in types:
+        rel_type = row['relationshipType']
+        probe = run_query(f"""
+            MATCH (a)-[:`{rel_type}`]->(b)
+            RETURN labels(a) AS start_labels, labels(b) AS end_labels
+            LIMIT 1
+        """, {})
+        for sample in probe:
+            for start in sample['start_labels']:
+                for end in sample['end_labels']:
+                    relationship = {'start': start, 'type': rel_type, 'end': end}
+                    if start in labels and end in labels and relationship not in relationships:
+                        relationships.append(relationship)
+
+    return {'generated_at': time.time(), 'nodes': nodes, 'relationships': relationships}
+
+
+def render_schema(snapshot: Dict) -> str:
+    lines = ["Node properties:"]
+    for label, properties in snapshot['nodes'].items():
+        props = []
+        for name, info in properties.items():
+            samples = ", ".join(repr(v) for v in info['samples'])
+            props.append(f"{name}: {info['type']}" + (f" (e.g. {samples})" if samples else ""))
+        lines.append(f"{label} {{{', '.join(props)}}}")
+
+    lines.append("The relationships:")
+    for rel in snapshot['relationships']:
+        lines.append(f"(:{rel['start']})-[:{rel['type']}]->(:{rel['end']})")
+    return "\n".join(lines)
+
+
+def write_schema_snapshot(run_query: Callable[[str, Dict], List[Dict]], labels: List[str] = SNAPSHOT_LABELS,
+                          path: str = SCHEMA_SNAPSHOT_PATH) -> Dict:
+    """Recompute and persist the snapshot; call this whenever a loader changes the schema"""
+    snapshot = build_schema_snapshot(run_query, labels)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+class SchemaStore:
+    """Serves the rendered schema from memory, reloading only when the snapshot file changes"""
+
+    def __init__(self, path: str = SCHEMA_SNAPSHOT_PATH,
+                 run_query: Optional[Callable[[str, Dict], List[Dict]]] = None,
+                 labels: List[str] = SNAPSHOT_LABELS):
+        self.path = path
+        self.run_query = run_query
+        self.labels = labels
+        self._mtime = None
+        self._schema = ""
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if mtime is None and self.run_query is not None:
+                # No loader has run since deployment: compute once and persist
+                write_schema_snapshot(self.run_query, self.labels, self.path)
+                mtime = os.stat(self.path).st_mtime_ns
+
+            if mtime is not None and mtime != self._mtime:
+                with open(self.path) as f:
+                    self._schema = render_schema(json.load(f))
+                self._mtime = mtime
+
+            return self._schema
@@ -1,10 +1,33 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-from neo4j import GraphDatabase
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from neo4j_access import get_neo4j
+from query_encoder import QueryEncoder, local_vector_search
+from game_index import load_game_index
+from name_resolver import GAME_TEXT_INDEX, fulltext_query, load_name_resolver
+from entity_linker import build_entity_linker
+from recommendations import top_games, pick_from_rankings
+from response_cache import ResponseCache, read_cache_epoch
+from context_builder import build_context, estimate_tokens
 from langchain_groq import ChatGroq
 
 load_dotenv()
+DEFAULT_STAGE_SECONDS = {'semantic': 0.05, 'graph': 0.3, 'llm': 3.0}
+
+CARD_SUMMARY_CHARS = 150
+PAGE_SIZE = 3
+
+SIDEBAR_EXAMPLES = [
+    "Games like The Witcher 3",
+    "Best RPGs with deep stories", 
+    "Highest rated story games",
+    "Emotional narrative games"
+]
 
 st.set_page_config(page_title="Game Finder", page_icon="🎮", layout="wide")
 
@@ -44,92 +67,180 @@ def initialize_system():
         temperature=0.1
     )
     
-    driver = GraphDatabase.driver(
-        os.getenv("NEO4J_URI"),
-        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
-    )
+    db = get_neo4j()
+    encoder = QueryEncoder()
+    return llm, db, encoder, load_game_index(encoder)
+
+@st.cache_resource(max_entries=1)
+def build_entity_linking(_db, _index, generation):
+    resolver = load_name_resolver(_db, _index)
+    return resolver, build_entity_linker(resolver)
+
+def get_entity_linking(db, encoder, index):
+    """Resolver and linker for the current catalog snapshot, rebuilt after game_embedding.py reloads it"""
+    if index is not None:
+        index.refresh()
+        return build_entity_linking(db, index, ('index', index.generation))
+    encoder.refresh()
+    return build_entity_linking(db, index, ('epoch', read_cache_epoch()))
+
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache()
+
+@st.cache_resource
+def get_retrieval_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="ragat")
+
+@st.cache_resource
+def get_stage_history():
+    return {stage: deque(maxlen=50) for stage in DEFAULT_STAGE_SECONDS}
+
+def expected_stage_seconds(stage):
+    samples = sorted(get_stage_history()[stage])
+    return samples[len(samples) // 2] if samples else DEFAULT_STAGE_SECONDS[stage]
+
+def record_stage(stage, seconds):
+    get_stage_history()[stage].append(seconds)
+
+# Stage functions run on pool threads, so they raise instead of calling st.error
+def semantic_search(db, encoder, index, query, top_k=5, cursor=None):
+    if index is not None:
+        index.refresh()
+        return index.search(query, top_k, cursor=cursor, summary_chars=CARD_SUMMARY_CHARS)
+    # Without the in-memory index, still encode with the vectorizer the stored embeddings came from
+    encoder.refresh()
+    return local_vector_search(db, encoder, query, top_k, cursor=cursor, summary_chars=CARD_SUMMARY_CHARS)
+
+def page_cursor(rows, seen, page_size):
+    """Cursor after the last row, or None when the page came back short (no more results)"""
+    if len(rows) < page_size:
+        return None
+    return {'score': rows[-1]['score'], 'game_id': rows[-1]['game.game_id'], 'seen': seen}
+
+def load_more_results(db, encoder, index):
+    """Button callback: fetch the next page only when the buffered rows run out"""
+    browse = st.session_state.browse
+    if len(browse['buffer']) < PAGE_SIZE and browse['cursor']:
+        try:
+            fetched = semantic_search(db, encoder, index, browse['query'], PAGE_SIZE, browse['cursor'])
+        except Exception as e:
+            browse['error'] = f"🔍 Loading more results failed: {e}"
+            return
+        browse['buffer'] += fetched
+        browse['cursor'] = page_cursor(fetched, browse['cursor']['seen'] + len(fetched), PAGE_SIZE)
+    page, browse['buffer'] = browse['buffer'][:PAGE_SIZE], browse['buffer'][PAGE_SIZE:]
+    # Cards are built once per page and only for pages the user asked for
+    browse['pages'].append("".join(format_game_recommendation(game, "semantic", game['score']) for game in page))
+
+def render_more_results(db, encoder, index, redraw=False):
+    """Extra pages under the answer; on a "load more" rerun (redraw) the answer itself is drawn again first"""
+    browse = st.session_state.get("browse")
+    if not browse:
+        return
+    if redraw:
+        with st.chat_message("assistant"):
+            for block, html in browse['shown']:
+                st.markdown(block, unsafe_allow_html=html)
+    if browse['pages']:
+        st.markdown(f"#### More matches for: *{browse['query']}*")
+        for page in browse['pages']:
+            st.markdown(page, unsafe_allow_html=True)
+    error = browse.pop('error', None)
+    if error:
+        st.error(error)
+    if browse['buffer'] or browse['cursor']:
+        st.button("Load more matches", on_click=load_more_results, args=(db, encoder, index))
+
+def graph_traversal_search(db, game_ids):
+    """One game_id lookup per linked game, reading the lists precomputed by recommendations.py"""
+    games = db.read("""
+        MATCH (g:Game)
+        WHERE g.game_id IN $game_ids
+        RETURN g.game_id as original_game_id,
+               g.name as original_game,
+               g.summary as original_summary,
+               g.user_review as original_rating,
+               g.recommendations as recommendations
+        """, {'game_ids': game_ids})
     
-    return llm, driver
+    results = []
+    for game in games:
+        if not game['recommendations']:
+            # Not precomputed yet (e.g. added since the last game_embedding run)
+            results.extend(live_graph_expansion(db, game['original_game_id']))
+            continue
+        recommendations = json.loads(game.pop('recommendations'))
+        results.append({**game, **recommendations})
+    # Keep the order in which the games were mentioned
+    return sorted(results, key=lambda result: game_ids.index(result['original_game_id']))
 
-def semantic_search(driver, query, top_k=5):
-    try:
-        with driver.session() as session:
-            result = session.run("""
-            WITH genai.vector.encode(
-                $question,
-                "OpenAI",
-                {
-                  token: $openAiApiKey,
-                  endpoint: $openAiEndpoint
-                }) AS question_embedding
-            CALL db.index.vector.queryNodes(
-                'story_game_embeddings',
-                $top_k,
-                question_embedding
-            ) YIELD node AS game, score
-            WHERE game.user_review > 6.0
-            RETURN game.name, game.summary, game.user_review, game.platform, score
-            ORDER BY score DESC
-            """, parameters={
-                'openAiApiKey': os.getenv("OPENAI_API_KEY"),
-                'openAiEndpoint': os.getenv("OPENAI_ENDPOINT_EMBEDDINGS"),
-                'question': query,
-                'top_k': top_k
-            })
-            return list(result)
-    except Exception as e:
-        st.error(f"🔍 Semantic search failed: {e}")
-        return []
+def live_graph_expansion(db, game_id):
+    """Lists for a game not precomputed yet, from its similar edges and the stored platform/genre rankings"""
+    games = db.read("""
+        MATCH (g:Game {game_id: $game_id})
+        OPTIONAL MATCH (g)-[r:SIMILAR_STORY]->(similar:Game)
+        WHERE similar.user_review > 7.0
+        WITH g, r, similar ORDER BY r.similarity DESC
+        WITH g, collect({name: similar.name, similarity: r.similarity, rating: similar.user_review})[0..3] as similar_games
+        OPTIONAL MATCH (g)-[:AVAILABLE_ON]->(platform:Platform)
+        WITH g, similar_games, collect(platform.name) as platforms
+        OPTIONAL MATCH (g)-[:BELONGS_TO]->(genre:Genre)
+        RETURN g.game_id as original_game_id,
+               g.name as original_game,
+               g.summary as original_summary,
+               g.user_review as original_rating,
+               similar_games, platforms, collect(genre.name) as genres
+        """, {'game_id': game_id})
+    
+    results = []
+    for game in games:
+        # Bounded reads of this game's own platforms and genres; top_n + 1 covers excluding the game itself
+        platforms = {name: top_games(db, 'Platform', name, 4) for name in game.pop('platforms')}
+        genres = {name: top_games(db, 'Genre', name, 3) for name in game.pop('genres')}
+        results.append({
+            **game,
+            'similar_games': [g for g in game['similar_games'] if g['name']],
+            'platform_recommendations': pick_from_rankings(game_id, platforms, platforms, 3),
+            'genre_recommendations': pick_from_rankings(game_id, genres, genres, 2)
+        })
+    return results
 
-def graph_traversal_search(driver, game_name):
+def timed_stage(search, *args):
+    started = time.perf_counter()
     try:
-        with driver.session() as session:
-            result = session.run("""
-            MATCH (g:Game)
-            WHERE toLower(g.name) CONTAINS toLower($game_name)
-            WITH g
-            OPTIONAL MATCH (g)-[r:SIMILAR_STORY]->(similar:Game)
-            WHERE similar.user_review > 7.0
-            OPTIONAL MATCH (g)-[:SAME_PLATFORM]->(platform_rec:Game)
-            WHERE platform_rec.user_review > 8.0
-            OPTIONAL MATCH (g)-[:BELONGS_TO]->(genre:Genre)<-[:BELONGS_TO]-(genre_rec:Game)
-            WHERE genre_rec.user_review > 7.5 AND genre_rec <> g
-            RETURN g.name as original_game,
-                   g.summary as original_summary,
-                   g.user_review as original_rating,
-                   collect(DISTINCT {name: similar.name, similarity: r.similarity, rating: similar.user_review})[0..3] as similar_games,
-                   collect(DISTINCT {name: platform_rec.name, rating: platform_rec.user_review})[0..3] as platform_recommendations,
-                   collect(DISTINCT {name: genre_rec.name, rating: genre_rec.user_review})[0..2] as genre_recommendations
-            LIMIT 1
-            """, parameters={'game_name': game_name})
-            return list(result)
+        return search(*args), time.perf_counter() - started, None
     except Exception as e:
-        st.error(f"🕸️ Graph traversal failed: {e}")
-        return []
-
-def hybrid_ragat_search(driver, query):
-    semantic_results = semantic_search(driver, query, 5)
-    graph_results = []
-    game_keywords = [
-        'witcher', 'zelda', 'mass effect', 'final fantasy', 'last of us', 
-        'god of war', 'horizon', 'cyberpunk', 'assassin', 'elder scrolls',
-        'persona', 'nier', 'bioshock', 'red dead', 'ghost of tsushima'
-    ]
+        return [], time.perf_counter() - started, e
+
+def hybrid_ragat_search(db, encoder, index, resolver, linker, query, on_stage=None, max_entities=3):
+    """Run the semantic and graph stages concurrently.
+
+    on_stage(stage, seconds, error) is called on the caller's thread as each stage finishes.
+    """
+    pool = get_retrieval_pool()
+    futures = {pool.submit(timed_stage, semantic_search, db, encoder, index, query, 5): 'semantic'}
+    entities = linker.link(query, resolver)[:max_entities]
+    if entities:
+        game_ids = [entity['game_id'] for entity in entities]
+        futures[pool.submit(timed_stage, graph_traversal_search, db, game_ids)] = 'graph'
     
-    for keyword in game_keywords:
-        if keyword in query.lower():
-            graph_results = graph_traversal_search(driver, keyword)
-            break
+    results = {'semantic': [], 'graph': []}
+    timings = {}
+    for future in as_completed(futures):
+        stage = futures[future]
+        results[stage], timings[stage], error = future.result()
+        record_stage(stage, timings[stage])
+        if on_stage:
+            on_stage(stage, timings[stage], error)
     
-    return semantic_results, graph_results
+    return results['semantic'], results['graph'], timings
 
 def format_game_recommendation(game, method="semantic", score=None):
     rating = f"⭐ {game.get('game.user_review', game.get('rating', 'N/A'))}/10" 
     platform = game.get('game.platform', game.get('platform', 'Multiple platforms'))
-    summary = game.get('game.summary', game.get('summary', 'No summary available'))
-    
-    if len(summary) > 150:
-        summary = summary[:150] + "..."
+    # Summaries arrive already cut to CARD_SUMMARY_CHARS by the retrieval layer
+    summary = game.get('game.summary', game.get('summary')) or 'No summary available'
     
     method_badge = {
         "semantic": '<span class="method-badge rag-badge">🔍 RAG Match</span>',
@@ -148,7 +259,72 @@ def format_game_recommendation(game, method="semantic", score=None):
     </div>
     """
 
-def process_with_ragat(driver, llm, query):
+def build_analysis_prompt(query, semantic_results, graph_results, index=None):
+    """Return (context, prompt, report) for the curator analysis; context and prompt are None when there is nothing to analyse"""
+    context_text, report = build_context(
+        semantic_results, graph_results, index.summary_for_name if index is not None else None
+    )
+    if not context_text:
+        return None, None, report
+    llm_prompt = f"""Based on these game recommendations:
+{context_text}
+Provide a thoughtful analysis of why these games match the query: "{query}". 
+Focus on narrative themes, gameplay elements, and what makes them special for story-focused gamers."""
+    report['prompt_tokens'] = estimate_tokens(llm_prompt)
+    return context_text, llm_prompt, report
+
+def cached_retrieval(cache, db, encoder, index, resolver, linker, query, on_stage=None):
+    """Return (semantic, graph, timings, errors, hit); only complete retrievals are cached"""
+    hit, cached = cache.get_retrieval(query)
+    if hit:
+        return (*cached, [], True)
+    
+    errors = []
+    def collect(stage, seconds, error):
+        if error:
+            errors.append((stage, error))
+        if on_stage:
+            on_stage(stage, seconds, error)
+    
+    semantic_results, graph_results, stage_timings = hybrid_ragat_search(db, encoder, index, resolver, linker, query, collect)
+    if not errors:
+        cache.put_retrieval(query, (semantic_results, graph_results, stage_timings))
+    return semantic_results, graph_results, stage_timings, errors, False
+
+@st.cache_resource
+def prewarm_examples(_llm, _db, _encoder, _index, _resolver, _linker):
+    """Fill the response cache for the sidebar examples once per process; analyses are generated in the background"""
+    cache = get_response_cache()
+    pending = []
+    for example in SIDEBAR_EXAMPLES:
+        semantic_results, graph_results, _, errors, _ = cached_retrieval(
+            cache, _db, _encoder, _index, _resolver, _linker, example
+        )
+        context_text, llm_prompt, _ = build_analysis_prompt(example, semantic_results, graph_results, _index)
+        if llm_prompt and not errors:
+            pending.append((example, context_text, llm_prompt))
+    
+    def generate():
+        for example, context_text, llm_prompt in pending:
+            try:
+                cache.put_analysis(example, context_text, _llm.invoke(llm_prompt).content)
+            except Exception as e:
+                print(f"Prewarming '{example}' failed: {e}")
+    
+    threading.Thread(target=generate, daemon=True).start()
+    return len(pending)
+
+def stream_llm_answer(llm, prompt, timings, on_first_token=None):
+    for chunk in llm.stream(prompt):
+        if 'first_token' not in timings:
+            timings['first_token'] = time.perf_counter()
+            if on_first_token:
+                on_first_token()
+        if getattr(chunk, 'usage_metadata', None):
+            timings['usage'] = chunk.usage_metadata
+        yield chunk.content
+
+def process_with_ragat(db, llm, encoder, index, resolver, linker, query):
     col1, col2 = st.columns([3, 1])
     
     with col2:
@@ -156,86 +332,134 @@ def process_with_ragat(driver, llm, query):
         progress = st.progress(0)
         status = st.empty()
     
-    status.text("RAG: Semantic search...")
-    progress.progress(25)
-    semantic_results, graph_results = hybrid_ragat_search(driver, query)
+    stage_labels = {'semantic': "🔍 Semantic search", 'graph': "🕸️ Graph traversal"}
+    expected_total = max(expected_stage_seconds('semantic'), expected_stage_seconds('graph')) + expected_stage_seconds('llm')
+    retrieval_started = time.perf_counter()
+    
+    def update_progress(label):
+        elapsed = time.perf_counter() - retrieval_started
+        progress.progress(min(95, int(100 * elapsed / expected_total)))
+        status.text(label)
     
-    status.text(" AT: Graph traversal...")
-    progress.progress(50)
+    def on_stage(stage, seconds, error):
+        update_progress(f"{stage_labels[stage]}: {seconds * 1000:.0f} ms")
     
-    status.text(" LLM: Generating response...")
-    progress.progress(75)
+    # Everything drawn for the answer is kept so "Load more matches" reruns can redraw it
+    shown = []
+    
+    def show(block, html=True):
+        st.markdown(block, unsafe_allow_html=html)
+        shown.append((block, html))
+    
+    cache = get_response_cache()
+    st.session_state.pop("browse", None)
+    status.text("Retrieving...")
+    semantic_results, graph_results, stage_timings, stage_errors, retrieval_hit = cached_retrieval(
+        cache, db, encoder, index, resolver, linker, query, on_stage
+    )
+    retrieval_time = time.perf_counter() - retrieval_started
+    for stage, error in stage_errors:
+        st.error(f"{stage_labels[stage]} failed: {error}")
+    
+    source = "from cache" if retrieval_hit else f"in {retrieval_time * 1000:.0f} ms"
+    update_progress(f"Retrieval done {source}, generating response...")
     
     with col1:
         if semantic_results or graph_results:
-            st.markdown("### Results")
+            show("### Results")
             
             if semantic_results:
-                st.markdown("#### **RAG Component** - Semantic Matches")
-                for i, game in enumerate(semantic_results[:3]):
+                show("#### **RAG Component** - Semantic Matches")
+                for i, game in enumerate(semantic_results[:PAGE_SIZE]):
                     score = game.get('score', 0)
-                    st.markdown(format_game_recommendation(game, "semantic", score), unsafe_allow_html=True)
+                    show(format_game_recommendation(game, "semantic", score))
+            
+            st.session_state.browse = {
+                'query': query,
+                'buffer': semantic_results[PAGE_SIZE:],
+                'cursor': page_cursor(semantic_results, len(semantic_results), 5),
+                'pages': [],
+                'shown': shown
+            }
             
             if graph_results and len(graph_results) > 0:
                 result = graph_results[0]
-                st.markdown("#### 🕸️ **AT Component** - Graph Connections")
+                show("#### 🕸️ **AT Component** - Graph Connections")
                 
                 if result['similar_games'] and any(g['name'] for g in result['similar_games']):
-                    st.markdown("**Story-Similar Games:**")
+                    show("**Story-Similar Games:**")
                     for similar in result['similar_games']:
                         if similar['name']:
-                            st.markdown(format_game_recommendation(similar, "graph"), unsafe_allow_html=True)
+                            show(format_game_recommendation(similar, "graph"))
                 
                 if result['platform_recommendations'] and any(g['name'] for g in result['platform_recommendations']):
-                    st.markdown("**Platform Recommendations:**")
+                    show("**Platform Recommendations:**")
                     for rec in result['platform_recommendations'][:2]:
                         if rec['name']:
-                            st.markdown(format_game_recommendation(rec, "graph"), unsafe_allow_html=True)
+                            show(format_game_recommendation(rec, "graph"))
             
-            st.markdown("#### **LLM Enhancement**")
-            context = []
-            if semantic_results:
-                context.extend([f"{g['game.name']}: {g['game.summary']}" for g in semantic_results[:3]])
-            if graph_results:
-                for result in graph_results:
-                    if result['similar_games']:
-                        context.extend([f"{g['name']}: Connected via story similarity" for g in result['similar_games'] if g['name']])
+            show("#### **LLM Enhancement**")
+            context_text, llm_prompt, context_report = build_analysis_prompt(query, semantic_results, graph_results, index)
             
-            if context:
-                llm_prompt = f"""Based on these game recommendations: {'; '.join(context[:5])}, 
-                provide a thoughtful analysis of why these games match the query: "{query}". 
-                Focus on narrative themes, gameplay elements, and what makes them special for story-focused gamers."""
-                
+            if llm_prompt:
                 try:
-                    llm_response = llm.invoke(llm_prompt)
-                    st.markdown(f" **AI Curator's Analysis:**\n\n{llm_response.content}")
+                    show(" **AI Curator's Analysis:**")
+                    token_text = (f"Context: {context_report['items']}/{context_report['candidates']} games, "
+                                  f"~{context_report['prompt_tokens']} prompt tokens")
+                    analysis_hit, analysis = cache.get_analysis(query, context_text)
+                    if analysis_hit:
+                        show(analysis, html=False)
+                        st.caption(f"Retrieval {source} | Analysis from cache | {token_text}")
+                    else:
+                        llm_started = time.perf_counter()
+                        timings = {}
+                        analysis = st.write_stream(stream_llm_answer(
+                            llm, llm_prompt, timings, lambda: update_progress("🤖 LLM: streaming answer...")
+                        ))
+                        record_stage('llm', time.perf_counter() - llm_started)
+                        if isinstance(analysis, str) and analysis:
+                            shown.append((analysis, False))
+                            cache.put_analysis(query, context_text, analysis)
+                        if 'first_token' in timings:
+                            stage_text = " | ".join(f"{stage}: {seconds * 1000:.0f} ms" for stage, seconds in stage_timings.items())
+                            st.caption(f"Retrieval {source} ({stage_text}) | "
+                                       f"First token: {(timings['first_token'] - llm_started) * 1000:.0f} ms | "
+                                       f"Full answer: {(time.perf_counter() - llm_started) * 1000:.0f} ms")
+                        usage = timings.get('usage')
+                        if usage:
+                            token_text += f" ({usage['input_tokens']} billed)"
+                        st.caption(token_text)
                 except Exception as e:
                     st.info(" The games above represent excellent matches based on story elements and player ratings.")
         
         else:
             st.warning(" No RAGAT matches found. Trying basic database search...")
-            with driver.session() as session:
-                basic_results = session.run("""
-                MATCH (g:Game)
-                WHERE toLower(g.summary) CONTAINS toLower($query) 
-                   OR toLower(g.name) CONTAINS toLower($query)
-                   AND g.user_review > 7.0
-                RETURN g.name, g.summary, g.user_review, g.platform
-                ORDER BY g.user_review DESC
-                LIMIT 5
-                """, parameters={'query': query})
-                
-                basic_list = list(basic_results)
-                if basic_list:
-                    st.markdown("### Basic Search Results")
-                    for game in basic_list:
-                        st.markdown(format_game_recommendation(game, "basic"), unsafe_allow_html=True)
-                else:
-                    st.error("No games found. Try different keywords!")
+            text_query = fulltext_query(query, operator="OR")
+            basic_list = db.read("""
+            CALL db.index.fulltext.queryNodes($index_name, $text_query, {limit: 50}) YIELD node AS g, score
+            WHERE g.user_review > 7.0
+            RETURN g.name,
+                   CASE WHEN size(g.summary) <= $summary_chars THEN g.summary
+                        ELSE left(g.summary, $summary_chars) + '...' END AS `g.summary`,
+                   g.user_review, g.platform
+            ORDER BY score DESC, g.user_review DESC
+            LIMIT 5
+            """, {
+                'index_name': GAME_TEXT_INDEX, 'text_query': text_query, 'summary_chars': CARD_SUMMARY_CHARS
+            }) if text_query else []
+            
+            if basic_list:
+                st.markdown("### Basic Search Results")
+                for game in basic_list:
+                    st.markdown(format_game_recommendation(game, "basic"), unsafe_allow_html=True)
+            else:
+                st.error("No games found. Try different keywords!")
     
     progress.progress(100)
 
-llm, driver = initialize_system()
+llm, db, encoder, index = initialize_system()
+resolver, linker = get_entity_linking(db, encoder, index)
+prewarm_examples(llm, db, encoder, index, resolver, linker)
 
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -244,32 +468,37 @@ for message in st.session_state.messages:
         else:
             st.markdown(message["content"])
 
-if prompt := st.chat_input("What kind of game are you searching?"):
+# Sidebar examples arrive through pending_query so they are processed like typed prompts
+if prompt := st.chat_input("What kind of game are you searching?") or st.session_state.pop("pending_query", None):
     st.session_state.messages.append({"role": "user", "content": prompt})
     
     with st.chat_message("user"):
         st.markdown(prompt)
     
     with st.chat_message("assistant"):
-        process_with_ragat(driver, llm, prompt)
+        process_with_ragat(db, llm, encoder, index, resolver, linker, prompt)
         st.session_state.messages.append({
             "role": "assistant", 
             "content": f" Analysis completed for: '{prompt}'"
         })
 
+render_more_results(db, encoder, index, redraw=not prompt)
+
 # Sidebar
 with st.sidebar:
     st.header("Quick Searches:")
     
-    examples = [
-        "Games like The Witcher 3",
-        "Best RPGs with deep stories", 
-        "Highest rated story games",
-        "Emotional narrative games"
-    ]
-    
-    for example in examples:
+    for example in SIDEBAR_EXAMPLES:
         if st.button(example):
-            st.session_state.messages.append({"role": "user", "content": example})
+            st.session_state.pending_query = example
             st.rerun()
+    
+    cache_stats = get_response_cache().stats()
+    st.caption(f"Cache hit rate: retrieval {cache_stats['retrieval']['hit_rate']:.0%} | "
+               f"analysis {cache_stats['analysis']['hit_rate']:.0%}")
+    if index is not None:
+        st.caption(f"In-memory index: {len(index):,} games")
+    encoding = encoder.latency_stats()
+    if encoding['count']:
+        st.caption(f"Query encoding p50 {encoding['p50'] * 1e6:.0f} µs | p99 {encoding['p99'] * 1e6:.0f} µs")
     
\ No newline at end of file
@@ -0,0 +1,107 @@
+import math
+import os
+import re
+
+# "rrf" (reciprocal-rank fusion) or "concat" (semantic hits first, then graph links)
+FUSION_STRATEGY = os.getenv("FUSION_STRATEGY", "rrf")
+RRF_K = 60
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+ITEM_TOKEN_BUDGET = int(os.getenv("ITEM_TOKEN_BUDGET", 80))
+MIN_ITEM_TOKENS = 12
+
+GRAPH_LISTS = {
+    'similar_games': 'similar story to {seed}',
+    'platform_recommendations': 'top rated on the same platform as {seed}',
+    'genre_recommendations': 'top rated in the same genre as {seed}'
+}
+
+
+def estimate_tokens(text):
+    """Rough Llama-style token count (about four characters per token) without shipping a tokenizer"""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def compress_summary(summary, max_tokens):
+    """Whole leading sentences that fit the budget, else the first words, cut on a word boundary"""
+    if not summary or max_tokens <= 0:
+        return ""
+    summary = re.sub(r"\s+", " ", summary).strip()
+    if estimate_tokens(summary) <= max_tokens:
+        return summary
+    kept = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", summary):
+        candidate = f"{kept} {sentence}".strip()
+        if estimate_tokens(candidate) > max_tokens:
+            break
+        kept = candidate
+    if kept:
+        return kept
+    words = summary[:max_tokens * 4].rsplit(" ", 1)[0]
+    return words.rstrip(",;:") + "..."
+
+
+def fuse_results(semantic_results, graph_results, strategy=FUSION_STRATEGY, k=RRF_K):
+    """Merge semantic hits and graph links into one ranking keyed by game name, keeping every relation"""
+    ranked_lists = [[
+        {'name': g['game.name'], 'summary': g['game.summary'], 'rating': g['game.user_review'],
+         'source': 'semantic', 'relation': 'semantic match for the query'}
+        for g in semantic_results
+    ]]
+    for result in graph_results:
+        for key, relation in GRAPH_LISTS.items():
+            ranked_lists.append([
+                {'name': g['name'], 'summary': None, 'rating': g['rating'],
+                 'source': 'graph', 'relation': relation.format(seed=result['original_game'])}
+                for g in result[key] if g['name']
+            ])
+
+    fused = {}
+    position = 0
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked, start=1):
+            position += 1
+            entry = fused.setdefault(item['name'], {
+                'name': item['name'], 'summary': None, 'rating': item['rating'],
+                'sources': set(), 'relations': [], 'score': 0.0
+            })
+            entry['sources'].add(item['source'])
+            if item['relation'] not in entry['relations']:
+                entry['relations'].append(item['relation'])
+            entry['summary'] = entry['summary'] or item['summary']
+            if strategy == "rrf":
+                entry['score'] += 1.0 / (k + rank)
+            else:
+                entry['score'] = max(entry['score'], 1.0 / position)
+
+    return sorted(fused.values(), key=lambda entry: entry['score'], reverse=True)
+
+
+def build_context(semantic_results, graph_results, summary_lookup=None,
+                  budget_tokens=CONTEXT_TOKEN_BUDGET, item_tokens=ITEM_TOKEN_BUDGET):
+    """Fill the token budget with deduplicated games in fused order.
+
+    summary_lookup(name) may supply a fuller summary than the card-length one
+    retrieval returned (graph links have none). Returns (context_text, report).
+    """
+    lines = []
+    used = 0
+    candidates = fuse_results(semantic_results, graph_results)
+    for entry in candidates:
+        rating = f", {entry['rating']}/10" if entry['rating'] is not None else ""
+        header = f"- {entry['name']} ({'; '.join(entry['relations'])}{rating})"
+        remaining = budget_tokens - used - estimate_tokens(header) - 1
+        if remaining < MIN_ITEM_TOKENS and lines:
+            break
+        summary = (summary_lookup(entry['name']) if summary_lookup else None) or entry['summary']
+        summary = compress_summary(summary, min(item_tokens, remaining))
+        line = f"{header}: {summary}" if summary else header
+        lines.append(line)
+        used += estimate_tokens(line) + 1
+
+    return "\n".join(lines), {
+        'candidates': len(candidates),
+        'items': len(lines),
+        'context_tokens': used,
+        'budget_tokens': budget_tokens
+    }
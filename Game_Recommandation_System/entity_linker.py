@@ -0,0 +1,163 @@
+import difflib
+import re
+import unicodedata
+from collections import deque
+from name_resolver import normalize_title
+
+# Single-word aliases that are ordinary query words rather than title mentions
+GENERIC_WORDS = {
+    'game', 'games', 'story', 'stories', 'rpg', 'rpgs', 'action', 'adventure', 'horror', 'best',
+    'like', 'similar', 'play', 'new', 'top', 'good', 'great', 'fun', 'open', 'world', 'deep'
+}
+
+# Words that, right before a single word, mark it as a title: "games like halo", "similar to doom"
+TITLE_CUES = [('like',), ('than',), ('similar', 'to'), ('play',), ('played',), ('playing',), ('loved',), ('enjoyed',)]
+
+
+def title_aliases(name):
+    """Normalized full title plus its main title before a subtitle: "The Witcher 3: Wild Hunt" -> "witcher 3" """
+    aliases = {normalize_title(name)}
+    main_title = re.split(r"\s*(?::| - | – )\s*", name or "", maxsplit=1)[0]
+    aliases.add(normalize_title(main_title))
+    return {
+        alias for alias in aliases
+        if alias and (" " in alias or (len(alias) >= 2 and not alias.isdigit() and alias not in GENERIC_WORDS))
+    }
+
+
+def query_words(query):
+    """Query words in their original casing, split exactly like normalize_title splits titles"""
+    text = unicodedata.normalize('NFKD', query or "").encode('ascii', 'ignore').decode()
+    return re.findall(r"[A-Za-z0-9]+", text)
+
+
+def single_word_mention(words, position):
+    """A lone word names a game when it is the whole query, is title-cased mid-query ("Halo") or follows a cue"""
+    if len(words) == 1 or (position > 0 and words[position][0].isupper()):
+        return True
+    preceding = tuple(word.lower() for word in words[:position])
+    return any(preceding[-len(cue):] == cue for cue in TITLE_CUES)
+
+
+class GameEntityLinker:
+    """Finds every catalog title mentioned in a query in one left-to-right pass.
+
+    An Aho-Corasick automaton over the word sequences of normalized titles and their
+    main-title aliases; working on words keeps matches on word boundaries and the
+    automaton small. Overlapping mentions resolve to the longest one, and an alias
+    shared by several games links to the best-rated of them. Single-word titles
+    ("Halo", "Control") match exactly and only in title context, so ordinary words
+    such as "great control" do not link.
+    """
+
+    def __init__(self, game_ids, names, ratings):
+        self.game_ids = list(game_ids)
+        self.names = list(names)
+        self.ratings = [None if r is None or r != r or r == float('-inf') else float(r) for r in ratings]
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        best = {}
+        for row, name in enumerate(self.names):
+            for alias in title_aliases(name):
+                current = best.get(alias)
+                if current is None or self._rank(row) > self._rank(current):
+                    best[alias] = row
+        self._alias_rows = best
+        for alias in best:
+            self._insert(alias.split())
+        self._build_failure_links()
+
+    def _rank(self, row):
+        rating = self.ratings[row]
+        return (rating if rating is not None else float('-inf'), -len(self.names[row]))
+
+    def _insert(self, tokens):
+        state = 0
+        for token in tokens:
+            if token not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = len(self._goto) - 1
+            state = self._goto[state][token]
+        self._output[state].append(" ".join(tokens))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._alias_rows)
+
+    def _correct(self, state, token, next_token, resolver, cutoff=0.8):
+        """Fuzzy-correct a word only where it continues a multi-word title.
+
+        Inside a partial match the word is compared with the title words that can follow;
+        at the start of a mention the correction must begin a longer title and the next
+        word must continue it. Single-word titles therefore only ever match exactly.
+        """
+        if token in self._goto[state] or token in GENERIC_WORDS or len(token) < 4:
+            return token
+        if state:
+            matches = difflib.get_close_matches(token, list(self._goto[state]), n=1, cutoff=cutoff)
+            return matches[0] if matches else token
+        corrected = resolver.correct(token, cutoff)
+        child = self._goto[0].get(corrected)
+        if child is not None and next_token in self._goto[child]:
+            return corrected
+        return token
+
+    def link(self, query, resolver=None):
+        """Return [{'game_id', 'name', 'rating', 'mention'}] in query order.
+
+        With a resolver, misspelt words that continue a multi-word title are
+        fuzzy-corrected first, so "wicher 3" still links.
+        """
+        words = query_words(query)
+        tokens = [word.lower() for word in words]
+
+        matches = []
+        state = 0
+        for end, token in enumerate(tokens, start=1):
+            if resolver is not None:
+                next_token = tokens[end] if end < len(tokens) else None
+                token = self._correct(state, token, next_token, resolver)
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for alias in self._output[state]:
+                start = end - len(alias.split())
+                if end - start > 1 or single_word_mention(words, start):
+                    matches.append((start, end, alias))
+
+        taken = set()
+        linked = []
+        for start, end, alias in sorted(matches, key=lambda m: (m[0] - m[1], m[0])):
+            span = set(range(start, end))
+            if span & taken:
+                continue
+            taken |= span
+            row = self._alias_rows[alias]
+            linked.append((start, {
+                'game_id': self.game_ids[row],
+                'name': self.names[row],
+                'rating': self.ratings[row],
+                'mention': alias
+            }))
+        return [entity for _, entity in sorted(linked, key=lambda item: item[0])]
+
+
+def build_entity_linker(resolver):
+    """Automaton over the same catalog snapshot the name resolver was built from"""
+    return GameEntityLinker(resolver.game_ids, resolver.names, resolver.ratings)
@@ -1,20 +1,22 @@
 from dotenv import load_dotenv
 import os
-from neo4j import GraphDatabase
+import sys
+import hashlib
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import pickle
+from neo4j_access import get_neo4j, close_neo4j
+from tfidf_store import (save_tfidf_artifacts, load_tfidf_artifacts, save_game_metadata,
+                         load_baseline_oov_rate, tfidf_artifacts_exist)
+from similarity import top_k_neighbours, batched
+from recommendations import refresh_all
+from genre_classifier import assign_genres
+from response_cache import bump_cache_epoch
 
 load_dotenv()
 
-def create_driver():
-    return GraphDatabase.driver(
-        os.getenv("NEO4J_URI"),
-        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
-        max_connection_lifetime=10 * 60,
-        keep_alive=True
-    )
+# Allowed rise in out-of-vocabulary rate before incremental mode falls back to a full refit
+DRIFT_THRESHOLD = float(os.getenv("TFIDF_DRIFT_THRESHOLD", "0.05"))
 
 def test_groq_connection():
     try:
@@ -30,34 +32,61 @@ def test_groq_connection():
         print(f"Groq API failed: {e}")
         return False
 
-def create_tfidf_embeddings(driver):
-    with driver.session() as session:
-        games = session.run("""
-        MATCH (g:Game)
-        WHERE g.name IS NOT NULL AND g.summary IS NOT NULL
-        OPTIONAL MATCH (g)-[:AVAILABLE_ON]->(p:Platform)
-        WITH g, collect(DISTINCT p.name) AS platforms
-        RETURN g.game_id, g.name, g.summary, g.user_review, g.platform, platforms
-        """).data()
+STORY_GAMES_QUERY = """
+MATCH (g:Game)
+WHERE g.name IS NOT NULL AND g.summary IS NOT NULL
+OPTIONAL MATCH (g)-[:AVAILABLE_ON]->(p:Platform)
+WITH g, collect(DISTINCT p.name) AS platforms
+RETURN g.game_id, g.name, g.summary, g.user_review, g.platform, platforms,
+       g.story_hash AS story_hash, g.embedding IS NULL AS missing_embedding
+"""
+
+def build_story_text(game):
+    platforms = game['platforms'] if game['platforms'] else []
+    platform_text = f" available on {', '.join(platforms)}" if platforms else ""
+    if not platform_text and game['g.platform']:
+        platform_text = f" on {game['g.platform']}"
+    
+    rating_text = f" Player rating: {game['g.user_review']}/10" if game['g.user_review'] else ""
+    
+    return f"Story Game: {game['g.name']}{platform_text}. Story: {game['g.summary']}{rating_text}"
+
+def story_hash(text):
+    return hashlib.md5(text.encode()).hexdigest()
+
+def save_metadata_for(game_ids, games):
+    """Write display metadata for the Game Finder's in-memory index in matrix row order"""
+    by_id = {game['g.game_id']: game for game in games}
+    missing = {'g.name': "", 'g.summary': "", 'g.platform': None, 'platforms': []}
+    rows = [by_id.get(game_id, missing) for game_id in game_ids]
+    save_game_metadata(
+        game_ids,
+        [game['g.name'] for game in rows],
+        [game['g.summary'] for game in rows],
+        [game['g.platform'] or ", ".join(game['platforms']) for game in rows]
+    )
+
+def out_of_vocabulary_rate(vectorizer, texts):
+    """Share of analyzed terms (after stop words and n-grams) that the vectorizer does not know"""
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    total = unknown = 0
+    for text in texts:
+        for term in analyze(text):
+            total += 1
+            unknown += term not in vocabulary
+    return unknown / total if total else 0.0
+
+def create_tfidf_embeddings(db):
+    games = db.read(STORY_GAMES_QUERY)
     
     if not games:
         print("No games found!")
         return 0
     
-    story_texts = []
-    game_ids = []
-    
-    for game in games:
-        platforms = game['platforms'] if game['platforms'] else []
-        platform_text = f" available on {', '.join(platforms)}" if platforms else ""
-        if not platform_text and game['g.platform']:
-            platform_text = f" on {game['g.platform']}"
-        
-        rating_text = f" Player rating: {game['g.user_review']}/10" if game['g.user_review'] else ""
-        
-        story_description = f"Story Game: {game['g.name']}{platform_text}. Story: {game['g.summary']}{rating_text}"
-        story_texts.append(story_description)
-        game_ids.append(game['g.game_id'])
+    story_texts = [build_story_text(game) for game in games]
+    game_ids = [game['g.game_id'] for game in games]
+    ratings = [game['g.user_review'] for game in games]
     
     vectorizer = TfidfVectorizer(
         max_features=512,
@@ -68,168 +97,216 @@ def create_tfidf_embeddings(driver):
     
     tfidf_matrix = vectorizer.fit_transform(story_texts)
     
-    with open('tfidf_vectorizer.pkl', 'wb') as f:
-        pickle.dump(vectorizer, f)
+    save_tfidf_artifacts(vectorizer, tfidf_matrix, game_ids, ratings,
+                         oov_rate=out_of_vocabulary_rate(vectorizer, story_texts))
+    save_metadata_for(game_ids, games)
     
+    embedded_count = write_embeddings(db, tfidf_matrix, game_ids, [story_hash(text) for text in story_texts])
+    print(f"Created {embedded_count} embeddings")
+    return embedded_count
+
+def write_embeddings(db, tfidf_matrix, game_ids, story_hashes, batch_size=500):
+    """Store vectors for the Neo4j vector index, densifying one batch of rows at a time"""
     embedded_count = 0
+    for start in range(0, len(game_ids), batch_size):
+        block = tfidf_matrix[start:start + batch_size].toarray()
+        rows = [
+            {'game_id': game_id, 'embedding': vector.tolist(), 'story_hash': text_hash}
+            for game_id, vector, text_hash in zip(
+                game_ids[start:start + batch_size], block, story_hashes[start:start + batch_size]
+            )
+        ]
+        try:
+            db.write("""
+            UNWIND $rows AS row
+            MATCH (g:Game {game_id: row.game_id})
+            SET g.story_hash = row.story_hash
+            WITH g, row
+            CALL db.create.setNodeVectorProperty(g, "embedding", row.embedding)
+            """, {'rows': rows})
+            embedded_count += len(rows)
+        except Exception as e:
+            print(f"Failed to store embeddings for rows {start}-{start + len(rows)}: {e}")
+    return embedded_count
+
+SIMILAR_STORY_QUERY = """
+UNWIND $edges AS edge
+MATCH (g1:Game {game_id: edge.source})
+MATCH (g2:Game {game_id: edge.target})
+MERGE (g1)-[r:SIMILAR_STORY]->(g2)
+SET r.similarity = edge.similarity
+"""
+
+def create_similarity_relationships(db, k=10, threshold=0.3, min_rating=7.0, batch_size=5000):
+    """Link each game rated above min_rating to its k most story-similar games"""
+    _, tfidf_matrix, all_game_ids, ratings = load_tfidf_artifacts()
     
-    with driver.session() as session:
-        for i, game_id in enumerate(game_ids):
-            try:
-                embedding = tfidf_matrix[i].toarray().flatten().tolist()
-                
-                session.run("""
-                MATCH (g:Game {game_id: $game_id})
-                CALL db.create.setNodeVectorProperty(g, "embedding", $embedding)
-                """, parameters={
-                    'game_id': game_id,
-                    'embedding': embedding
-                })
-                
-                embedded_count += 1
-                    
-            except Exception as e:
-                print(f"Failed to store embedding for {game_id}: {e}")
-                continue
+    # NaN ratings compare False, so unrated games drop out here
+    eligible = np.flatnonzero(ratings > min_rating)
+    if len(eligible) < 2:
+        print("Not enough games with embeddings")
+        return
     
-    print(f"Created {embedded_count} embeddings")
-    return embedded_count
+    game_ids = [all_game_ids[i] for i in eligible]
+    matrix = tfidf_matrix[eligible]
+    
+    edges = (
+        {'source': game_ids[i], 'target': game_ids[j], 'similarity': score}
+        for i, j, score in top_k_neighbours(matrix, k=k, threshold=threshold)
+    )
+    
+    relationships_created = 0
+    for batch in batched(edges, batch_size):
+        try:
+            db.write(SIMILAR_STORY_QUERY, {'edges': batch})
+            relationships_created += len(batch)
+        except Exception as e:
+            print(f"Failed to write {len(batch)} similarity relationships: {e}")
+    
+    print(f"Created {relationships_created} similarity relationships")
 
-def create_similarity_relationships(driver):
-    with driver.session() as session:
-        games = session.run("""
-        MATCH (g:Game)
-        WHERE g.embedding IS NOT NULL AND g.user_review > 6.0
-        RETURN g.game_id, g.name, g.embedding, g.user_review
-        """).data()
-        
-        if len(games) < 2:
-            print("Not enough games with embeddings")
-            return
-        
-        embeddings = []
-        game_info = []
-        
-        for game in games:
-            embeddings.append(game['g.embedding'])
-            game_info.append({
-                'id': game['g.game_id'],
-                'name': game['g.name'],
-                'rating': game['g.user_review']
-            })
-        
-        similarity_matrix = cosine_similarity(embeddings)
-        
-        relationships_created = 0
-        
-        for i in range(len(game_info)):
-            for j in range(i + 1, len(game_info)):
-                similarity = similarity_matrix[i][j]
-                
-                if (similarity > 0.3 and 
-                    game_info[i]['rating'] > 7.0 and 
-                    game_info[j]['rating'] > 7.0):
-                    
-                    try:
-                        session.run("""
-                        MATCH (g1:Game {game_id: $game_id1})
-                        MATCH (g2:Game {game_id: $game_id2})
-                        MERGE (g1)-[r:SIMILAR_STORY]->(g2)
-                        SET r.similarity = $similarity
-                        MERGE (g2)-[r2:SIMILAR_STORY]->(g1)
-                        SET r2.similarity = $similarity
-                        """, parameters={
-                            'game_id1': game_info[i]['id'],
-                            'game_id2': game_info[j]['id'],
-                            'similarity': float(similarity)
-                        })
-                        
-                        relationships_created += 1
-                        
-                    except Exception as e:
-                        print(f"Failed to create relationship: {e}")
-        
-        print(f"Created {relationships_created} similarity relationships")
+def update_tfidf_embeddings(db, drift_threshold=DRIFT_THRESHOLD, k=10, threshold=0.3, min_rating=7.0):
+    """Embed only new or changed games with the persisted vectorizer.
+
+    Returns the game_ids that were updated, or None when vocabulary drift means
+    the vectorizer should be refitted on the whole catalog instead.
+    """
+    vectorizer, tfidf_matrix, game_ids, ratings = load_tfidf_artifacts()
+    games = db.read(STORY_GAMES_QUERY)
+    
+    changed = []
+    for game in games:
+        text = build_story_text(game)
+        text_hash = story_hash(text)
+        if game['missing_embedding'] or game['story_hash'] != text_hash:
+            changed.append((game, text, text_hash))
+    
+    if not changed:
+        print("All embeddings are up to date")
+        save_metadata_for(game_ids, games)
+        return []
+    
+    texts = [text for _, text, _ in changed]
+    drift = out_of_vocabulary_rate(vectorizer, texts) - load_baseline_oov_rate()
+    if not drift <= drift_threshold:  # NaN baseline also forces a refit
+        print(f"Vocabulary drift {drift:.3f} exceeds {drift_threshold}, refitting TF-IDF")
+        return None
+    
+    new_rows = vectorizer.transform(texts).tocsr()
+    changed_ids = [game['g.game_id'] for game, _, _ in changed]
+    changed_ratings = [game['g.user_review'] for game, _, _ in changed]
+    
+    # Replace rows of games we already had, append the rest
+    changed_set = set(changed_ids)
+    keep = np.array([game_id not in changed_set for game_id in game_ids], dtype=bool)
+    new_count = len(changed_set.difference(game_ids))
+    tfidf_matrix = sparse.vstack([tfidf_matrix[keep], new_rows]).tocsr()
+    ratings = np.concatenate([ratings[keep], np.array(
+        [np.nan if r is None else r for r in changed_ratings], dtype=float
+    )])
+    game_ids = [game_id for game_id, kept in zip(game_ids, keep) if kept] + changed_ids
+    save_tfidf_artifacts(vectorizer, tfidf_matrix, game_ids, ratings, oov_rate=load_baseline_oov_rate())
+    save_metadata_for(game_ids, games)
+    
+    write_embeddings(db, new_rows, changed_ids, [text_hash for _, _, text_hash in changed])
+    print(f"Updated {len(changed_ids)} embeddings ({new_count} new)")
+    
+    # Recompute outgoing SIMILAR_STORY edges for changed games only
+    eligible = np.flatnonzero(ratings > min_rating)
+    candidate_ids = [game_ids[i] for i in eligible]
+    changed_positions = [i for i, r in enumerate(changed_ratings) if r is not None and r > min_rating]
+    db.write("""
+    UNWIND $game_ids AS game_id
+    MATCH (:Game {game_id: game_id})-[r:SIMILAR_STORY]->()
+    DELETE r
+    """, {'game_ids': changed_ids})
+    
+    if changed_positions and len(candidate_ids) > 1:
+        edges = (
+            {'source': changed_ids[changed_positions[i]], 'target': candidate_ids[j], 'similarity': score}
+            for i, j, score in top_k_neighbours(
+                new_rows[changed_positions], k=k + 1, threshold=threshold, candidates=tfidf_matrix[eligible]
+            )
+            if candidate_ids[j] != changed_ids[changed_positions[i]]
+        )
+        for batch in batched(edges, 5000):
+            db.write(SIMILAR_STORY_QUERY, {'edges': batch})
+    
+    return changed_ids
 
-def main():
-    driver = create_driver()
+def main(incremental=False):
+    db = get_neo4j()
     
     if not test_groq_connection():
         print("Groq API test failed, continuing with TF-IDF embeddings...")
     
     print("Creating vector index...")
-    with driver.session() as session:
-        session.run("""
-        CREATE VECTOR INDEX story_game_embeddings IF NOT EXISTS
-        FOR (g:Game) ON (g.embedding)
-        OPTIONS {
-          indexConfig: {
-            `vector.dimensions`: 512,
-            `vector.similarity_function`: 'cosine'
-          }
-        }
-        """)
-
-    print("Generating embeddings...")
-    embedded_count = create_tfidf_embeddings(driver)
-    
-    if embedded_count == 0:
-        print("No embeddings created. Exiting.")
-        driver.close()
-        return
+    db.run("""
+    CREATE VECTOR INDEX story_game_embeddings IF NOT EXISTS
+    FOR (g:Game) ON (g.embedding)
+    OPTIONS {
+      indexConfig: {
+        `vector.dimensions`: 512,
+        `vector.similarity_function`: 'cosine'
+      }
+    }
+    """)
+
+    updated = None
+    if incremental and tfidf_artifacts_exist():
+        print("Updating embeddings incrementally...")
+        updated = update_tfidf_embeddings(db)
+    
+    if updated is None:
+        print("Generating embeddings...")
+        embedded_count = create_tfidf_embeddings(db)
+        
+        if embedded_count == 0:
+            print("No embeddings created. Exiting.")
+            close_neo4j()
+            return
 
-    create_similarity_relationships(driver)
+        create_similarity_relationships(db)
 
     print("Creating genre relationships...")
-    with driver.session() as session:
-        session.run("""
-        MATCH (g:Game)
-        WHERE g.summary IS NOT NULL
-        WITH g,
-             CASE 
-                 WHEN g.summary =~ '(?i).*(RPG|role.playing|character.*level|quest).*' THEN 'RPG'
-                 WHEN g.summary =~ '(?i).*(action|combat|fight|battle).*' THEN 'Action'
-                 WHEN g.summary =~ '(?i).*(adventure|explore|journey).*' THEN 'Adventure'
-                 WHEN g.summary =~ '(?i).*(strategy|tactical|plan).*' THEN 'Strategy'
-                 WHEN g.summary =~ '(?i).*(puzzle|solve|mystery).*' THEN 'Puzzle'
-                 WHEN g.summary =~ '(?i).*(racing|car|speed).*' THEN 'Racing'
-                 WHEN g.summary =~ '(?i).*(sport|football|soccer|basketball).*' THEN 'Sports'
-                 ELSE 'General'
-             END as detected_genre
-        MERGE (genre:Genre {name: detected_genre})
-        MERGE (g)-[:BELONGS_TO]->(genre)
-        """)
-
-    print("Creating platform relationships...")
-    with driver.session() as session:
-        session.run("""
-        MATCH (g1:Game)-[:AVAILABLE_ON]->(p:Platform)<-[:AVAILABLE_ON]-(g2:Game)
-        WHERE g1 <> g2 
-          AND g1.user_review > 8.0 
-          AND g2.user_review > 8.0
-        MERGE (g1)-[r:SAME_PLATFORM]->(g2)
-        SET r.platform = p.name
-        """)
-
-    with driver.session() as session:
-        stats = session.run("""
-        RETURN 
-            count{(g:Game)} as total_games,
-            count{(g:Game WHERE g.embedding IS NOT NULL)} as games_with_embeddings,
-            count{()-[:SIMILAR_STORY]->()} as story_similarities,
-            count{()-[:BELONGS_TO]->()} as genre_relationships,
-            count{()-[:SAME_PLATFORM]->()} as platform_relationships,
-            count{(genre:Genre)} as detected_genres
-        """).single()
-
-        print(f"Total games: {stats['total_games']}")
-        print(f"Games with embeddings: {stats['games_with_embeddings']}")
-        print(f"Story similarities: {stats['story_similarities']}")
-        print(f"Genre relationships: {stats['genre_relationships']}")
-        print(f"Platform relationships: {stats['platform_relationships']}")
-        print(f"Detected genres: {stats['detected_genres']}")
-
-    driver.close()
+    db.run("CREATE CONSTRAINT genre_name IF NOT EXISTS FOR (genre:Genre) REQUIRE genre.name IS UNIQUE")
+    if updated is None:
+        assign_genres(db)
+    elif updated:
+        assign_genres(db, updated)
+
+    # Platform recommendations now come from per-platform rankings (Platform.top_games),
+    # so drop the pairwise SAME_PLATFORM edges left by earlier runs
+    db.run("""
+    MATCH ()-[r:SAME_PLATFORM]->()
+    CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS
+    """)
+
+    print("Ranking platforms and genres, precomputing recommendation lists...")
+    if updated is None:
+        refresh_all(db)
+    elif updated:
+        refresh_all(db, updated)
+    bump_cache_epoch()
+
+    stats = db.read("""
+    RETURN 
+        count{(g:Game)} as total_games,
+        count{(g:Game WHERE g.embedding IS NOT NULL)} as games_with_embeddings,
+        count{()-[:SIMILAR_STORY]->()} as story_similarities,
+        count{()-[:BELONGS_TO]->()} as genre_relationships,
+        count{(p:Platform WHERE p.top_games IS NOT NULL)} as ranked_platforms,
+        count{(genre:Genre)} as detected_genres
+    """)[0]
+
+    print(f"Total games: {stats['total_games']}")
+    print(f"Games with embeddings: {stats['games_with_embeddings']}")
+    print(f"Story similarities: {stats['story_similarities']}")
+    print(f"Genre relationships: {stats['genre_relationships']}")
+    print(f"Ranked platforms: {stats['ranked_platforms']}")
+    print(f"Detected genres: {stats['detected_genres']}")
+
+    close_neo4j()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(incremental="--incremental" in sys.argv)
\ No newline at end of file
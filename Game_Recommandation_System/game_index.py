@@ -0,0 +1,132 @@
+import os
+import threading
+import numpy as np
+from sklearn.preprocessing import normalize
+from tfidf_store import (ARTIFACT_DIR, MATRIX_FILE, load_tfidf_artifacts,
+                         load_game_metadata, game_metadata_exists)
+
+
+class TextColumn:
+    """Read-only string column backed by one UTF-8 buffer and row offsets"""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return self.data[self.offsets[row]:self.offsets[row + 1]].tobytes().decode('utf-8')
+
+    def prefix(self, row, chars):
+        """First `chars` characters plus "..." when longer, decoding only the bytes needed"""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        text = self.data[start:min(end, start + 4 * chars)].tobytes().decode('utf-8', errors='ignore')
+        return text[:chars] + "..." if end - start > chars and len(text) > chars else text
+
+
+class GameIndex:
+    """In-memory TF-IDF vector search over the games, with no database round-trip.
+
+    Vectors stay in the persisted CSR matrix (L2-normalised, so a dot product is the
+    cosine) and metadata in columnar arrays aligned with its rows. Neo4j is only needed
+    for graph expansion of the hits.
+    """
+
+    def __init__(self, encoder, directory=ARTIFACT_DIR):
+        self.encoder = encoder
+        self.directory = directory
+        self._mtime = None
+        self._lock = threading.Lock()
+        # Bumped on every reload so snapshots built from the index (name resolver, linker) know to rebuild
+        self.generation = 0
+        self.refresh()
+
+    def refresh(self):
+        """Reload the artifacts if game_embedding.py has rewritten them since the last load.
+
+        The vectorizer is swapped into the encoder together with the matrix: a refit
+        changes the vocabulary, and queries must be encoded with the one the rows use.
+        """
+        mtime = os.stat(os.path.join(self.directory, MATRIX_FILE)).st_mtime_ns
+        if mtime == self._mtime:
+            return False
+
+        vectorizer_mtime = self.encoder.vectorizer_mtime()
+        vectorizer, matrix, game_ids, ratings = load_tfidf_artifacts(self.directory)
+        metadata = load_game_metadata(self.directory)
+        if metadata['game_ids'] != game_ids:
+            raise ValueError("game_metadata.npz is out of sync with the TF-IDF matrix; rerun game_embedding.py")
+
+        with self._lock:
+            self.encoder.use_vectorizer(vectorizer, vectorizer_mtime)
+            self.matrix = normalize(matrix.astype(np.float32), norm="l2", copy=False)
+            self.game_ids = np.array(game_ids)
+            self.ratings = np.nan_to_num(ratings.astype(np.float32), nan=-np.inf)
+            self.names = TextColumn(*metadata['names'])
+            self.summaries = TextColumn(*metadata['summaries'])
+            self.platforms = TextColumn(*metadata['platforms'])
+            self._rows_by_name = {self.names[row]: row for row in range(len(self.names))}
+            self._mtime = mtime
+            self.generation += 1
+        return True
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def search(self, query, top_k=5, min_rating=6.0, cursor=None, summary_chars=None):
+        """Top-k games by cosine to the query among those rated above min_rating.
+
+        Results are ordered by (score desc, game_id); pass the last row's
+        {'score', 'game_id'} as `cursor` to get the next page.
+        """
+        with self._lock:
+            # Encoded under the lock so the query and the matrix always share a vocabulary
+            query_row = self.encoder.transform(query)
+            if not query_row.nnz:
+                return []
+            matrix, ratings, game_ids = self.matrix, self.ratings, self.game_ids
+            scores = matrix @ normalize(query_row.astype(np.float32)).T.toarray().ravel()
+            scores[(ratings <= min_rating) | (scores <= 0)] = -np.inf
+            if cursor is not None:
+                after = (scores < cursor['score']) | ((scores == cursor['score']) & (game_ids > cursor['game_id']))
+                scores[~after] = -np.inf
+
+            top_k = min(top_k, int(np.isfinite(scores).sum()))
+            if top_k <= 0:
+                return []
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.lexsort((game_ids[top], -scores[top]))]
+
+            return [
+                {
+                    'game.game_id': str(game_ids[row]),
+                    'game.name': self.names[row],
+                    'game.summary': self.summaries.prefix(row, summary_chars) if summary_chars else self.summaries[row],
+                    'game.user_review': float(ratings[row]),
+                    'game.platform': self.platforms[row],
+                    'score': float(scores[row])
+                }
+                for row in top
+            ]
+
+
+    def summary_for_name(self, name, chars=None):
+        """Summary of the game with this exact title, or None if it is not in the index"""
+        with self._lock:
+            row = self._rows_by_name.get(name)
+            if row is None:
+                return None
+            return self.summaries.prefix(row, chars) if chars else self.summaries[row]
+
+
+def load_game_index(encoder, directory=ARTIFACT_DIR):
+    """GameIndex from the persisted artifacts, or None if game_embedding.py has not produced them"""
+    if not game_metadata_exists(directory):
+        return None
+    try:
+        return GameIndex(encoder, directory)
+    except Exception as e:
+        print(f"In-memory game index unavailable: {e}")
+        return None
@@ -1,65 +1,21 @@
 import csv
 import os
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
+import queue
+import threading
 import time
+import numpy as np
+from neo4j_access import get_neo4j, close_neo4j
+from response_cache import bump_cache_epoch
 
-load_dotenv()
+GAMES_CSV_PATH = "data/video_games.csv"
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
 
-def create_driver():
-    return GraphDatabase.driver(
-        os.getenv("NEO4J_URI"),
-        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
-        max_connection_lifetime=10 * 60, 
-        keep_alive=True,
-        max_connection_pool_size=10, 
-        connection_timeout=30,
-        connection_acquisition_timeout=60  
-    )
-
-def test_connection(driver):
+def execute_query(db, cypher, params=None):
     try:
-        with driver.session() as session:
-            result = session.run("RETURN 'Connection successful' as message")
-            print(result.single()["message"])
-            return True
+        return db.write(cypher, params)
     except Exception as e:
-        print(f"Connection failed: {e}")
-        return False
-
-def execute_query_with_fresh_connection(driver, cypher, params=None, retries=3):
-    for attempt in range(retries):
-        try:
-            with driver.session() as session:
-                result = session.run(cypher, params)
-                return list(result)
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            if attempt < retries - 1:
-                print(f"Waiting {2 ** attempt} seconds before retry...")
-                time.sleep(2 ** attempt)
-                if not test_connection(driver):
-                    print("Connection lost, recreating driver...")
-                    driver.close()
-                    driver = create_driver()
-            else:
-                print(f"Query failed after {retries} attempts: {e}")
-                return None
-    return driver  
-
-def execute_query(driver, cypher, params=None, retries=3):
-    for attempt in range(retries):
-        try:
-            with driver.session() as session:
-                result = session.run(cypher, params)
-                return result
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            if attempt < retries - 1:
-                time.sleep(2 ** attempt)
-            else:
-                print(f"Query failed after {retries} attempts: {e}")
-                return None
+        print(f"Query failed: {e}")
+        return None
 
 def safe_string(value):
     return str(value).strip() if value and str(value).strip() else None
@@ -70,215 +26,297 @@ def safe_float(value):
     except:
         return None
 
-def create_constraints(driver):
+def create_constraints(db):
     constraints = [
         "CREATE CONSTRAINT game_id IF NOT EXISTS FOR (g:Game) REQUIRE g.game_id IS UNIQUE",
         "CREATE CONSTRAINT platform_name IF NOT EXISTS FOR (p:Platform) REQUIRE p.name IS UNIQUE"
     ]
     for constraint in constraints:
-        result = execute_query(driver, constraint)
-        if result is None:
-            print(f"Failed to create constraint: {constraint}")
+        try:
+            db.run(constraint)
+        except Exception as e:
+            print(f"Failed to create constraint: {constraint} ({e})")
 
-def create_indexes(driver):
+def create_indexes(db):
     indexes = [
         "CREATE INDEX game_name IF NOT EXISTS FOR (g:Game) ON (g.name)",
         "CREATE INDEX game_rating IF NOT EXISTS FOR (g:Game) ON (g.user_review)",
-        "CREATE INDEX platform_name_idx IF NOT EXISTS FOR (p:Platform) ON (p.name)"
+        "CREATE INDEX platform_name_idx IF NOT EXISTS FOR (p:Platform) ON (p.name)",
+        "CREATE FULLTEXT INDEX game_text IF NOT EXISTS FOR (g:Game) ON EACH [g.name, g.summary]"
     ]
     for index in indexes:
-        result = execute_query(driver, index)
-        if result is None:
-            print(f"Failed to create index: {index}")
+        try:
+            db.run(index)
+        except Exception as e:
+            print(f"Failed to create index: {index} ({e})")
 
-def create_game_node(driver, game_id, name, platform, release_date, summary, user_review):
-    query = """
-    MERGE (g:Game {game_id: $game_id})
-    SET g.name = $name,
-        g.platform = $platform,
-        g.release_date = $release_date,
-        g.summary = $summary,
-        g.user_review = $user_review,
-        g.has_story = CASE WHEN $summary IS NOT NULL THEN true ELSE false END
-    """
-    return execute_query(driver, query, {
-        'game_id': game_id,
-        'name': name,
-        'platform': platform,
-        'release_date': release_date,
-        'summary': summary,
-        'user_review': user_review
-    })
+UPSERT_GAMES_QUERY = """
+UNWIND $rows AS row
+MERGE (g:Game {game_id: row.game_id})
+SET g.name = row.name,
+    g.platform = row.platform,
+    g.release_date = row.release_date,
+    g.summary = row.summary,
+    g.user_review = row.user_review,
+    g.has_story = row.summary IS NOT NULL
+WITH g, row
+WHERE row.platform IS NOT NULL
+MERGE (p:Platform {name: row.platform})
+MERGE (g)-[:AVAILABLE_ON]->(p)
+"""
+
+# Used by parallel ingest once every Platform already exists, so writers only
+# take relationship locks on the hot platform nodes instead of racing to MERGE them
+UPSERT_GAMES_PREMERGED_QUERY = """
+UNWIND $rows AS row
+MERGE (g:Game {game_id: row.game_id})
+SET g.name = row.name,
+    g.platform = row.platform,
+    g.release_date = row.release_date,
+    g.summary = row.summary,
+    g.user_review = row.user_review,
+    g.has_story = row.summary IS NOT NULL
+WITH g, row
+WHERE row.platform IS NOT NULL
+MATCH (p:Platform {name: row.platform})
+MERGE (g)-[:AVAILABLE_ON]->(p)
+"""
 
-def create_platform_node(driver, platform):
-    if platform:
-        return execute_query(driver, "MERGE (p:Platform {name: $platform})", {'platform': platform})
+class AdaptiveBatchSizer:
+    """Grow batches while transactions are fast, shrink them when they approach the target latency"""
 
-def create_relationships(driver, game_id, platform):
-    if platform:
-        query = """
-        MATCH (g:Game {game_id: $game_id}), (p:Platform {name: $platform})
-        MERGE (g)-[:AVAILABLE_ON]->(p)
-        """
-        return execute_query(driver, query, {'game_id': game_id, 'platform': platform})
+    def __init__(self, initial=500, minimum=50, maximum=5000, target_seconds=1.0):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
 
-def create_rating_relationships_batched(driver):
-    """Create rating relationships for top games only - avoids memory issues"""
-    print("Creating rating relationships for high-quality games...")
+    def record(self, rows, seconds):
+        if seconds < self.target_seconds / 2:
+            self.size = min(self.maximum, self.size * 2)
+        elif seconds > self.target_seconds:
+            # Scale to the observed per-row cost so the next batch lands near the target
+            self.size = max(self.minimum, int(rows * self.target_seconds / seconds))
+
+def rating_window_pairs(ratings, window=0.4):
+    """Yield (i, j) index pairs with |ratings[i] - ratings[j]| <= window via one sort and a sliding window"""
+    order = np.argsort(ratings, kind="stable")
+    sorted_ratings = ratings[order]
+    # Small tolerance so 8.9 - 8.5 still counts as within 0.4
+    upper = np.searchsorted(sorted_ratings, sorted_ratings + window + 1e-9, side="right")
+    for i in range(len(order)):
+        for j in range(i + 1, upper[i]):
+            yield order[i], order[j]
+
+def create_rating_relationships_batched(db, min_rating=8.5, window=0.4, batch_size=5000):
+    """Link every high-rated game to each game within `window` rating points, in both directions"""
+    print(f"Creating rating relationships for games rated {min_rating}+...")
     
-    # Check how many great games we have
-    check_query = """
-    MATCH (g:Game) 
-    WHERE toFloat(g.user_review) >= 8.5
-    RETURN count(g) as excellent_games
-    """
+    games = db.read("""
+    MATCH (g:Game)
+    WHERE g.user_review >= $min_rating
+    RETURN g.game_id AS game_id, g.user_review AS rating
+    """, {'min_rating': min_rating})
+    print(f"Found {len(games)} games rated {min_rating}+")
+    if len(games) < 2:
+        return 0
     
-    result = execute_query_with_fresh_connection(driver, check_query)
-    if result and len(result) > 0:
-        count = result[0]['excellent_games']
-        print(f"Found {count} excellent games (rating 8.5+)")
-        
-        if count == 0:
-            print("No highly rated games found - trying lower threshold...")
-            # Try with lower rating if no excellent games found
-            check_query = """
-            MATCH (g:Game) 
-            WHERE toFloat(g.user_review) >= 7.5
-            RETURN count(g) as good_games
-            """
-            result = execute_query_with_fresh_connection(driver, check_query)
-            if result and len(result) > 0:
-                count = result[0]['good_games']
-                print(f"Found {count} good games (rating 7.5+)")
+    game_ids = [game['game_id'] for game in games]
+    ratings = np.array([game['rating'] for game in games], dtype=float)
     
-    # Connect only the best games to avoid memory problems
-    print("Connecting similar high-rated games...")
     query = """
-    MATCH (g1:Game), (g2:Game)
-    WHERE toFloat(g1.user_review) >= 8.5 
-      AND toFloat(g2.user_review) >= 8.5
-      AND g1 <> g2
-      AND abs(toFloat(g1.user_review) - toFloat(g2.user_review)) <= 0.4
-    WITH g1, g2 LIMIT 1000
+    UNWIND $pairs AS pair
+    MATCH (g1:Game {game_id: pair[0]}), (g2:Game {game_id: pair[1]})
     MERGE (g1)-[:SIMILAR_RATING]->(g2)
     MERGE (g2)-[:SIMILAR_RATING]->(g1)
-    RETURN count(*) as created
     """
     
-    result = execute_query_with_fresh_connection(driver, query)
+    created = 0
+    pairs = []
+    for i, j in rating_window_pairs(ratings, window):
+        pairs.append([game_ids[i], game_ids[j]])
+        if len(pairs) >= batch_size:
+            if execute_query(db, query, {'pairs': pairs}) is not None:
+                created += len(pairs)
+            pairs = []
+    if pairs and execute_query(db, query, {'pairs': pairs}) is not None:
+        created += len(pairs)
     
-    if result and len(result) > 0 and result[0]['created']:
-        created = result[0]['created'] * 2  # bidirectional relationships
-        print(f"Successfully created {created} rating relationships!")
-        return driver
+    print(f"Created {created * 2} rating relationships")  # bidirectional
+    return created
+
+def batch_process_games(db, games_batch, query=UPSERT_GAMES_QUERY):
+    """Write Game, Platform and AVAILABLE_ON for a whole batch in one UNWIND transaction"""
+    rows = [
+        {
+            'game_id': game_id,
+            'name': name,
+            'platform': platform,
+            'release_date': release_date,
+            'summary': summary,
+            'user_review': user_review
+        }
+        for game_id, name, platform, release_date, summary, user_review in games_batch
+    ]
+    try:
+        db.write_counters(query, {'rows': rows})
+        return True
+    except Exception as e:
+        print(f"Batch of {len(rows)} games failed: {e}")
+        return False
+
+def parse_game_row(row_count, row):
+    name = safe_string(row["name"])
+    summary = safe_string(row["summary"])
+    if not name or not summary:
+        return None
     
-    # If that didn't work, try an even simpler approach
-    print("Trying with smaller batch of top games...")
-    simple_query = """
-    MATCH (g1:Game), (g2:Game)
-    WHERE toFloat(g1.user_review) >= 9.0 
-      AND toFloat(g2.user_review) >= 9.0
-      AND g1 <> g2
-    WITH g1, g2 LIMIT 100
-    MERGE (g1)-[:SIMILAR_RATING]->(g2)
-    MERGE (g2)-[:SIMILAR_RATING]->(g1)
-    RETURN count(*) as created
-    """
+    return (
+        f"game_{row_count}",
+        name,
+        safe_string(row["platform"]),
+        safe_string(row["release_date"]),
+        summary,
+        safe_float(row["user_review"])
+    )
+
+def read_games(path):
+    with open(path, "r", encoding="utf-8") as file:
+        for row_count, row in enumerate(csv.DictReader(file), start=1):
+            game = parse_game_row(row_count, row)
+            if game:
+                yield game
+
+def load_games_serial(db, path):
+    written = 0
+    sizer = AdaptiveBatchSizer()
+    games_batch = []
     
-    result = execute_query_with_fresh_connection(driver, simple_query)
+    def flush(batch):
+        batch_started = time.perf_counter()
+        ok = batch_process_games(db, batch)
+        sizer.record(len(batch), time.perf_counter() - batch_started)
+        return len(batch) if ok else 0
     
-    if result and len(result) > 0:
-        created = result[0]['created'] * 2
-        print(f"Created {created} relationships between masterpiece games (9.0+ rating)")
-    else:
-        print("Could not create rating relationships - try using Neo4j Desktop for better memory handling")
+    for game in read_games(path):
+        games_batch.append(game)
+        
+        if len(games_batch) >= sizer.size:
+            written += flush(games_batch)
+            games_batch = []
+            print(f"Processed {written} games (next batch size {sizer.size})...")
     
-    return driver
+    if games_batch:
+        written += flush(games_batch)
+    return written
 
-def batch_process_games(driver, games_batch):
-    for game_data in games_batch:
-        game_id, name, platform, release_date, summary, user_review = game_data
-        
-        if create_game_node(driver, game_id, name, platform, release_date, summary, user_review):
-            create_platform_node(driver, platform)
-            create_relationships(driver, game_id, platform)
+def load_games_parallel(db, path, workers):
+    """Parse on the calling thread, commit UNWIND batches from `workers` writer threads"""
+    platforms = sorted({game[2] for game in read_games(path) if game[2]})
+    db.write_counters("UNWIND $names AS name MERGE (p:Platform {name: name})", {'names': platforms})
+    print(f"Pre-merged {len(platforms)} platforms")
+    
+    batches = queue.Queue(maxsize=workers * 2)
+    sizer = AdaptiveBatchSizer()
+    lock = threading.Lock()
+    written = [0]
+    
+    def writer():
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            batch_started = time.perf_counter()
+            ok = batch_process_games(db, batch, UPSERT_GAMES_PREMERGED_QUERY)
+            with lock:
+                sizer.record(len(batch), time.perf_counter() - batch_started)
+                if ok:
+                    written[0] += len(batch)
+                    print(f"Processed {written[0]} games (next batch size {sizer.size})...")
+    
+    threads = [threading.Thread(target=writer, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    
+    try:
+        games_batch = []
+        for game in read_games(path):
+            games_batch.append(game)
+            if len(games_batch) >= sizer.size:
+                batches.put(games_batch)
+                games_batch = []
+        if games_batch:
+            batches.put(games_batch)
+    finally:
+        for _ in threads:
+            batches.put(None)
+        for thread in threads:
+            thread.join()
+    
+    return written[0]
 
-def main():
-    driver = create_driver()
-    if not test_connection(driver):
+def main(workers=INGEST_WORKERS):
+    db = get_neo4j()
+    if not db.verify():
         print("Cannot connect to Neo4j. Check your credentials and network.")
         return
     
     print("Clearing database...")
-    if execute_query(driver, "MATCH (n) DETACH DELETE n") is None:
+    if execute_query(db, "MATCH (n) DETACH DELETE n") is None:
         print("Failed to clear database")
         return
     
     print("Creating constraints and indexes...")
-    create_constraints(driver)
-    create_indexes(driver)
+    create_constraints(db)
+    create_indexes(db)
     
-    row_count = 0
-    batch_size = 50
-    games_batch = []
+    # Leave one pooled connection free for the platform pre-merge and stats queries
+    workers = min(workers, db.pool_size - 1)
     
+    load_started = time.perf_counter()
     try:
-        with open("data/video_games.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                row_count += 1
-                
-                game_id = f"game_{row_count}"
-                name = safe_string(row["name"])
-                platform = safe_string(row["platform"])
-                release_date = safe_string(row["release_date"])
-                summary = safe_string(row["summary"])
-                user_review = safe_float(row["user_review"])
-                
-                if not name or not summary:
-                    continue
-                
-                games_batch.append((game_id, name, platform, release_date, summary, user_review))
-                
-                if len(games_batch) >= batch_size:
-                    batch_process_games(driver, games_batch)
-                    games_batch = []
-                    print(f"Processed {row_count} games...")
-            
-            if games_batch:
-                batch_process_games(driver, games_batch)
+        if workers > 1:
+            print(f"Loading games with {workers} parallel writers...")
+            written = load_games_parallel(db, GAMES_CSV_PATH, workers)
+        else:
+            written = load_games_serial(db, GAMES_CSV_PATH)
+        
+        load_time = time.perf_counter() - load_started
+        print(f"Wrote {written} games in {load_time:.1f}s ({written / load_time if load_time else 0:.0f} rows/sec)")
         
         print("\nStarting relationship creation...")
-        print("This focuses on high-quality games to avoid memory issues...")
         
-        driver = create_rating_relationships_batched(driver)
+        create_rating_relationships_batched(db)
+        bump_cache_epoch()
         
-        # Skip platform relationships for now to avoid errors
-        print("Skipping platform relationships to avoid connection issues...")
+        # Platform recommendations are per-platform rankings built by game_embedding.py,
+        # not pairwise SAME_PLATFORM edges
         
         print("Getting final statistics...")
         try:
-            with driver.session() as session:
-                stats = session.run("""
-                RETURN 
-                    count{(g:Game)} as games,
-                    count{(p:Platform)} as platforms,
-                    count{()-[:AVAILABLE_ON]->()} as platform_relations,
-                    count{()-[:SIMILAR_RATING]->()} as rating_relations
-                """).single()
-                
-                print(f"\nDatabase loaded successfully:")
-                print(f"Games: {stats['games']}")
-                print(f"Platforms: {stats['platforms']}")
-                print(f"Platform relationships: {stats['platform_relations']}")
-                print(f"Rating relationships: {stats['rating_relations']}")
+            stats = db.read("""
+            RETURN 
+                count{(g:Game)} as games,
+                count{(p:Platform)} as platforms,
+                count{()-[:AVAILABLE_ON]->()} as platform_relations,
+                count{()-[:SIMILAR_RATING]->()} as rating_relations
+            """)[0]
+            
+            print(f"\nDatabase loaded successfully:")
+            print(f"Games: {stats['games']}")
+            print(f"Platforms: {stats['platforms']}")
+            print(f"Platform relationships: {stats['platform_relations']}")
+            print(f"Rating relationships: {stats['rating_relations']}")
+            
+            if stats['rating_relations'] > 0:
+                print(f"You have {stats['rating_relations']} rating-based connections between similar games.")
+            else:
+                print(f"\nTip: Consider using Neo4j Desktop for better memory handling and more relationships.")
+            
+            pool = db.stats()
+            print(f"Neo4j: {pool['writes']} writes, {pool['retries']} retries, "
+                  f"peak pool utilization {pool['peak_pool_utilization']:.0%}")
                 
-                if stats['rating_relations'] > 0:
-                    print(f"You have {stats['rating_relations']} rating-based connections between similar games.")
-                else:
-                    print(f"\nTip: Consider using Neo4j Desktop for better memory handling and more relationships.")
-                    
         except Exception as e:
             print(f"Failed to get final stats: {e}")
     
@@ -287,7 +325,7 @@ def main():
     except Exception as e:
         print(f"Unexpected error: {e}")
     finally:
-        driver.close()
+        close_neo4j()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
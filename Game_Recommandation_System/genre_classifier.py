@@ -0,0 +1,109 @@
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from neo4j_access import get_neo4j, close_neo4j
+from similarity import batched
+
+# Keyword alternatives per genre, matched on word boundaries
+GENRE_PATTERNS = {
+    'RPG': r"rpgs?|role[\s-]?playing|quests?|character(?:\s+\w+){0,3}\s+level(?:s|ing)?|level(?:ing)?\s+up",
+    'Action': r"action|combat|fight(?:s|ing|ers?)?|battl(?:e|es|ing)",
+    'Adventure': r"adventures?|explor(?:e|es|ing|ation)|journeys?",
+    'Strategy': r"strateg(?:y|ic|ies)|tactic(?:s|al)|plan(?:s|ning)?",
+    'Puzzle': r"puzzles?|solv(?:e|es|ing)|myster(?:y|ies|ious)",
+    'Racing': r"racing|racers?|cars?|speed",
+    'Sports': r"sports?|football|soccer|basketball"
+}
+DEFAULT_GENRE = 'General'
+MAX_GENRES = 3
+
+# One alternation with a named group per genre, so a single scan scores every genre
+GENRE_REGEX = re.compile(
+    "|".join(rf"\b(?P<{genre}>{pattern})\b" for genre, pattern in GENRE_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+WRITE_GENRES_QUERY = """
+UNWIND $rows AS row
+MATCH (g:Game {game_id: row.game_id})
+OPTIONAL MATCH (g)-[old:BELONGS_TO]->(:Genre)
+DELETE old
+WITH DISTINCT g, row
+UNWIND row.genres AS assigned
+MATCH (genre:Genre {name: assigned.name})
+MERGE (g)-[r:BELONGS_TO]->(genre)
+SET r.score = assigned.score
+"""
+
+
+def score_genres(summary):
+    """Keyword hits per genre in one pass over the summary"""
+    return Counter(match.lastgroup for match in GENRE_REGEX.finditer(summary or ""))
+
+
+def classify_summary(summary, max_genres=MAX_GENRES):
+    """[(genre, hits)] for the best-scoring genres, or the default genre when nothing matches"""
+    scores = score_genres(summary)
+    if not scores:
+        return [(DEFAULT_GENRE, 0)]
+    return scores.most_common(max_genres)
+
+
+def classify_chunk(games):
+    return [
+        {'game_id': game_id, 'genres': [{'name': genre, 'score': hits} for genre, hits in classify_summary(summary)]}
+        for game_id, summary in games
+    ]
+
+
+def classify_games(games, chunk_size=2000, workers=None):
+    """Classify (game_id, summary) pairs, fanning chunks out to worker processes for large catalogs"""
+    chunks = list(batched(games, chunk_size))
+    if len(chunks) <= 1:
+        return [row for chunk in chunks for row in classify_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return [row for rows in pool.map(classify_chunk, chunks) for row in rows]
+
+
+def assign_genres(db, game_ids=None, batch_size=1000):
+    """Tag games with BELONGS_TO edges; game_ids=None reclassifies the whole catalog"""
+    if game_ids is None:
+        games = db.read("""
+        MATCH (g:Game)
+        WHERE g.summary IS NOT NULL
+        RETURN g.game_id AS game_id, g.summary AS summary
+        """)
+    else:
+        games = db.read("""
+        UNWIND $game_ids AS game_id
+        MATCH (g:Game {game_id: game_id})
+        WHERE g.summary IS NOT NULL
+        RETURN g.game_id AS game_id, g.summary AS summary
+        """, {'game_ids': game_ids})
+
+    rows = classify_games([(game['game_id'], game['summary']) for game in games])
+
+    db.write("""
+    UNWIND $names AS name
+    MERGE (:Genre {name: name})
+    """, {'names': list(GENRE_PATTERNS) + [DEFAULT_GENRE]})
+
+    written = 0
+    for batch in batched(rows, batch_size):
+        try:
+            db.write(WRITE_GENRES_QUERY, {'rows': batch})
+            written += len(batch)
+        except Exception as e:
+            print(f"Failed to write genres for {len(batch)} games: {e}")
+
+    counts = Counter(genre['name'] for row in rows for genre in row['genres'])
+    print(f"Assigned genres to {written} games: " + ", ".join(f"{name} {count}" for name, count in counts.most_common()))
+    return written
+
+
+if __name__ == "__main__":
+    db = get_neo4j()
+    assign_genres(db, sys.argv[1:] or None)
+    close_neo4j()
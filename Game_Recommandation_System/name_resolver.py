@@ -0,0 +1,71 @@
+import difflib
+import re
+import unicodedata
+from collections import defaultdict
+
+# Created by game_loader.create_indexes
+GAME_TEXT_INDEX = "game_text"
+
+
+def normalize_title(text):
+    """Lowercase ASCII words only, without a leading article: "The Witcher® 3" -> "witcher 3" """
+    text = unicodedata.normalize('NFKD', text or "").encode('ascii', 'ignore').decode()
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    return re.sub(r"^(the|a|an) ", "", text)
+
+
+def fulltext_query(text, field=None, operator="AND"):
+    """Lucene query for the game_text index built from plain words, so user input cannot inject syntax"""
+    terms = normalize_title(text).split()
+    if not terms:
+        return None
+    query = f" {operator} ".join(terms)
+    return f"{field}:({query})" if field else query
+
+
+class GameNameResolver:
+    """Catalog snapshot (game_ids, names, ratings) and its title vocabulary, held in memory.
+
+    The entity linker builds its automaton from this snapshot and uses correct() to
+    fuzzy-match misspelt title words; vocabulary words are bucketed by first letter so
+    a correction only compares against a small slice of it.
+    """
+
+    def __init__(self, game_ids, names, ratings):
+        self.game_ids = list(game_ids)
+        self.names = list(names)
+        self.ratings = [float('-inf') if r is None or r != r else float(r) for r in ratings]
+        self._tokens = {token for name in self.names for token in normalize_title(name).split()}
+        self._vocabulary = defaultdict(list)
+        for token in sorted(self._tokens):
+            self._vocabulary[token[0]].append(token)
+
+    def __len__(self):
+        return len(self.game_ids)
+
+    def correct(self, token, cutoff=0.8):
+        """Closest title word sharing the first letter, or None"""
+        if token in self._tokens or token.isdigit():
+            return token
+        matches = difflib.get_close_matches(token, self._vocabulary.get(token[0], []), n=1, cutoff=cutoff)
+        return matches[0] if matches else None
+
+
+def load_name_resolver(db, index=None):
+    """Build from the in-memory game index when available, otherwise with one catalog read"""
+    if index is not None:
+        return GameNameResolver(
+            index.game_ids.tolist(),
+            [index.names[row] for row in range(len(index))],
+            [None if r == float('-inf') else r for r in index.ratings.tolist()]
+        )
+    games = db.read("""
+    MATCH (g:Game)
+    WHERE g.name IS NOT NULL
+    RETURN g.game_id AS game_id, g.name AS name, g.user_review AS rating
+    """)
+    return GameNameResolver(
+        [game['game_id'] for game in games],
+        [game['name'] for game in games],
+        [game['rating'] for game in games]
+    )
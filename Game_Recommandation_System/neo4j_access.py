@@ -0,0 +1,132 @@
+import os
+import threading
+from neo4j import GraphDatabase
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Neo4jAccess:
+    """One long-lived pooled driver per process, used through managed transactions.
+
+    execute_read/execute_write retry transient errors on another pooled connection,
+    and results are consumed inside the transaction so they never outlive the session.
+    """
+
+    def __init__(self, uri=None, username=None, password=None, database=None,
+                 max_connection_pool_size=10, **driver_config):
+        self.database = database or os.getenv("NEO4J_DATABASE") or None
+        self.pool_size = max_connection_pool_size
+        self.driver = GraphDatabase.driver(
+            uri or os.getenv("NEO4J_URI"),
+            auth=(username or os.getenv("NEO4J_USERNAME"), password or os.getenv("NEO4J_PASSWORD")),
+            max_connection_pool_size=max_connection_pool_size,
+            max_connection_lifetime=10 * 60,
+            keep_alive=True,
+            connection_timeout=30,
+            connection_acquisition_timeout=60,
+            **driver_config
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._peak = 0
+        self._counts = {'reads': 0, 'writes': 0, 'autocommit': 0, 'retries': 0, 'failures': 0}
+
+    def _checkout(self, kind):
+        with self._lock:
+            self._active += 1
+            self._peak = max(self._peak, self._active)
+            self._counts[kind] += 1
+
+    def _checkin(self, attempts, failed):
+        with self._lock:
+            self._active -= 1
+            self._counts['retries'] += max(0, attempts - 1)
+            if failed:
+                self._counts['failures'] += 1
+
+    def _execute(self, kind, work):
+        attempts = [0]
+
+        def counted(tx):
+            attempts[0] += 1
+            return work(tx)
+
+        self._checkout(kind)
+        failed = False
+        try:
+            with self.driver.session(database=self.database) as session:
+                if kind == 'reads':
+                    return session.execute_read(counted)
+                return session.execute_write(counted)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._checkin(attempts[0], failed)
+
+    def read(self, query, params=None):
+        return self._execute('reads', lambda tx: tx.run(query, params or {}).data())
+
+    def write(self, query, params=None):
+        return self._execute('writes', lambda tx: tx.run(query, params or {}).data())
+
+    def write_counters(self, query, params=None):
+        """Run a write and return its update counters instead of rows"""
+        return self._execute('writes', lambda tx: tx.run(query, params or {}).consume().counters)
+
+    def run(self, query, params=None):
+        """Auto-commit query, for schema commands and CALL { } IN TRANSACTIONS"""
+        self._checkout('autocommit')
+        failed = False
+        try:
+            with self.driver.session(database=self.database) as session:
+                return session.run(query, params or {}).data()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._checkin(1, failed)
+
+    def verify(self):
+        try:
+            self.driver.verify_connectivity()
+            return True
+        except Exception as e:
+            print(f"Connection failed: {e}")
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counts,
+                'active_sessions': self._active,
+                'peak_sessions': self._peak,
+                'pool_size': self.pool_size,
+                'pool_utilization': self._active / self.pool_size,
+                'peak_pool_utilization': self._peak / self.pool_size
+            }
+
+    def close(self):
+        self.driver.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_neo4j(**kwargs):
+    """Process-wide Neo4jAccess; the first caller's settings win"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Neo4jAccess(**kwargs)
+        return _shared
+
+
+def close_neo4j():
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -0,0 +1,164 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+from tfidf_store import ARTIFACT_DIR, VECTORIZER_FILE, load_vectorizer
+
+# Must match `vector.dimensions` of the story_game_embeddings index
+INDEX_DIMENSIONS = 512
+
+# Cards only need these fields; summaries are cut in the database rather than after transfer
+LOCAL_SEARCH_QUERY = """
+CALL db.index.vector.queryNodes('story_game_embeddings', $candidates, $embedding)
+YIELD node AS game, score
+WHERE game.user_review > $min_rating
+  AND ($cursor_score IS NULL OR score < $cursor_score
+       OR (score = $cursor_score AND game.game_id > $cursor_game_id))
+RETURN game.game_id, game.name,
+       CASE WHEN $summary_chars IS NULL OR size(game.summary) <= $summary_chars THEN game.summary
+            ELSE left(game.summary, $summary_chars) + '...' END AS `game.summary`,
+       game.user_review, game.platform, score
+ORDER BY score DESC, game.game_id
+LIMIT $top_k
+"""
+
+REMOTE_SEARCH_QUERY = """
+WITH genai.vector.encode(
+    $question,
+    "OpenAI",
+    {
+      token: $openAiApiKey,
+      endpoint: $openAiEndpoint
+    }) AS question_embedding
+CALL db.index.vector.queryNodes('story_game_embeddings', $top_k, question_embedding)
+YIELD node AS game, score
+WHERE game.user_review > $min_rating
+RETURN game.name, game.summary, game.user_review, game.platform, score
+ORDER BY score DESC
+"""
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class QueryEncoder:
+    """Encodes questions with the same fitted TF-IDF vectorizer that produced the game embeddings"""
+
+    def __init__(self, directory=ARTIFACT_DIR, dimensions=INDEX_DIMENSIONS, window=500):
+        self.directory = directory
+        self.dimensions = dimensions
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._vectorizer_mtime = None
+        self.refresh()
+
+    def vectorizer_mtime(self):
+        return os.stat(os.path.join(self.directory, VECTORIZER_FILE)).st_mtime_ns
+
+    def use_vectorizer(self, vectorizer, mtime):
+        self.vectorizer = vectorizer
+        self._vectorizer_mtime = mtime
+
+    def refresh(self):
+        """Reload the vectorizer if game_embedding.py has refitted it since the last load"""
+        mtime = self.vectorizer_mtime()
+        if mtime == self._vectorizer_mtime:
+            return False
+        self.use_vectorizer(load_vectorizer(self.directory), mtime)
+        return True
+
+    def transform(self, query):
+        """Sparse 1 x vocabulary TF-IDF row for the query"""
+        started = time.perf_counter()
+        row = self.vectorizer.transform([query])
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+        return row
+
+    def encode(self, query):
+        """Return the query vector padded to the index width, or None if no term is in the vocabulary"""
+        row = self.transform(query)
+        if not row.nnz:
+            return None
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        vector[row.indices] = row.data
+        return vector.tolist()
+
+    def latency_stats(self):
+        with self._lock:
+            samples = list(self._latencies)
+        return {'count': len(samples), 'p50': percentile(samples, 0.5), 'p99': percentile(samples, 0.99)}
+
+
+def local_vector_search(db, encoder, query, top_k=5, min_rating=6.0, cursor=None, summary_chars=None):
+    """Same contract as GameIndex.search, against the Neo4j vector index"""
+    embedding = encoder.encode(query)
+    if embedding is None:
+        return []
+    cursor = cursor or {}
+    # The vector index has no offset, so ask for everything up to the end of this page (twice over for the rating filter)
+    candidates = 2 * (cursor.get('seen', 0) + top_k)
+    return db.read(LOCAL_SEARCH_QUERY, {
+        'embedding': embedding,
+        'candidates': candidates,
+        'top_k': top_k,
+        'min_rating': min_rating,
+        'cursor_score': cursor.get('score'),
+        'cursor_game_id': cursor.get('game_id'),
+        'summary_chars': summary_chars
+    })
+
+
+def remote_vector_search(db, query, top_k=5, min_rating=6.0):
+    return db.read(REMOTE_SEARCH_QUERY, {
+        'openAiApiKey': os.getenv("OPENAI_API_KEY"),
+        'openAiEndpoint': os.getenv("OPENAI_ENDPOINT_EMBEDDINGS"),
+        'question': query,
+        'top_k': top_k,
+        'min_rating': min_rating
+    })
+
+
+def compare_search_latency(db, queries, rounds=5):
+    """Time the in-database OpenAI encoding path against local TF-IDF encoding, end to end"""
+    encoder = QueryEncoder()
+    paths = {
+        'remote (genai.vector.encode)': lambda q: remote_vector_search(db, q),
+        'local (TF-IDF encoder)': lambda q: local_vector_search(db, encoder, q)
+    }
+    for name, search in paths.items():
+        samples = []
+        for _ in range(rounds):
+            for query in queries:
+                started = time.perf_counter()
+                try:
+                    search(query)
+                except Exception as e:
+                    print(f"{name} failed: {e}")
+                    break
+                samples.append(time.perf_counter() - started)
+        if samples:
+            print(f"{name}: p50 {percentile(samples, 0.5) * 1000:.1f} ms, "
+                  f"p99 {percentile(samples, 0.99) * 1000:.1f} ms over {len(samples)} queries")
+
+    stats = encoder.latency_stats()
+    if stats['count']:
+        print(f"Local encoding alone: p50 {stats['p50'] * 1e6:.0f} us, p99 {stats['p99'] * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    from neo4j_access import get_neo4j, close_neo4j
+    queries = sys.argv[1:] or [
+        "Games like The Witcher 3",
+        "Best RPGs with deep stories",
+        "Highest rated story games",
+        "Emotional narrative games"
+    ]
+    compare_search_latency(get_neo4j(), queries)
+    close_neo4j()
@@ -0,0 +1,191 @@
+import json
+import sys
+from neo4j_access import get_neo4j, close_neo4j
+from similarity import batched
+
+# Length of the rating-sorted list stored on each Platform and Genre node
+RANKING_SIZE = 20
+
+# Sizes and rating floors the Game Finder shows for each list
+LIST_SPECS = {
+    'similar_games': {'top_n': 3, 'min_rating': 7.0},
+    'platform_recommendations': {'top_n': 3, 'min_rating': 8.0},
+    'genre_recommendations': {'top_n': 2, 'min_rating': 7.5}
+}
+
+GAME_NEIGHBOURS_QUERY = """
+UNWIND $game_ids AS game_id
+MATCH (g:Game {game_id: game_id})
+CALL {
+    WITH g
+    MATCH (g)-[r:SIMILAR_STORY]->(similar:Game)
+    WHERE similar.user_review > $similar_rating
+    WITH similar, r ORDER BY r.similarity DESC LIMIT $similar_n
+    RETURN collect({name: similar.name, similarity: r.similarity, rating: similar.user_review}) AS similar_games
+}
+CALL {
+    WITH g
+    OPTIONAL MATCH (g)-[:AVAILABLE_ON]->(platform:Platform)
+    RETURN collect(DISTINCT platform.name) AS platforms
+}
+OPTIONAL MATCH (g)-[:BELONGS_TO]->(genre:Genre)
+RETURN g.game_id AS game_id, similar_games, platforms, collect(genre.name) AS genres
+"""
+
+# One rating-sorted list per platform/genre instead of pairwise edges or a two-hop fan-out per game
+RANKING_QUERIES = {
+    'platform': """
+    MATCH (owner:Platform)<-[:AVAILABLE_ON]-(g:Game)
+    WHERE g.user_review > $min_rating
+    WITH owner, g ORDER BY g.user_review DESC, g.game_id
+    WITH owner, collect({game_id: g.game_id, name: g.name, rating: g.user_review})[..$limit] AS games
+    RETURN owner.name AS name, games
+    """,
+    'genre': """
+    MATCH (owner:Genre)<-[:BELONGS_TO]-(g:Game)
+    WHERE g.user_review > $min_rating
+    WITH owner, g ORDER BY g.user_review DESC, g.game_id
+    WITH owner, collect({game_id: g.game_id, name: g.name, rating: g.user_review})[..$limit] AS games
+    RETURN owner.name AS name, games
+    """
+}
+
+RANKING_SPECS = {
+    'platform': {'label': 'Platform', 'list': 'platform_recommendations'},
+    'genre': {'label': 'Genre', 'list': 'genre_recommendations'}
+}
+
+WRITE_RECOMMENDATIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (g:Game {game_id: row.game_id})
+SET g.recommendations = row.recommendations
+"""
+
+
+def compute_rankings(db):
+    """{'platform': {name: games}, 'genre': {name: games}}, best-rated first"""
+    rankings = {}
+    for kind, query in RANKING_QUERIES.items():
+        min_rating = LIST_SPECS[RANKING_SPECS[kind]['list']]['min_rating']
+        rows = db.read(query, {'min_rating': min_rating, 'limit': RANKING_SIZE})
+        rankings[kind] = {row['name']: row['games'] for row in rows}
+    return rankings
+
+
+def store_rankings(db, rankings):
+    """Persist each list as Platform.top_games / Genre.top_games (JSON)"""
+    for kind, lists in rankings.items():
+        db.write(f"""
+        UNWIND $rows AS row
+        MATCH (owner:{RANKING_SPECS[kind]['label']} {{name: row.name}})
+        SET owner.top_games = row.games
+        """, {'rows': [{'name': name, 'games': json.dumps(games)} for name, games in lists.items()]})
+
+
+def load_rankings(db):
+    rankings = {}
+    for kind, spec in RANKING_SPECS.items():
+        rows = db.read(f"""
+        MATCH (owner:{spec['label']})
+        WHERE owner.top_games IS NOT NULL
+        RETURN owner.name AS name, owner.top_games AS games
+        """)
+        rankings[kind] = {row['name']: json.loads(row['games']) for row in rows}
+    return rankings
+
+
+def top_games(db, label, name, k=10):
+    """Bounded top-k read of one platform's or genre's stored ranking"""
+    rows = db.read(f"MATCH (owner:{label} {{name: $name}}) RETURN owner.top_games AS games", {'name': name})
+    if not rows or not rows[0]['games']:
+        return []
+    return json.loads(rows[0]['games'])[:k]
+
+
+def pick_from_rankings(game_id, owners, ranked_lists, top_n):
+    """Best-rated games across the game's platforms (or genres), excluding the game itself"""
+    candidates = {}
+    for owner in owners:
+        for game in ranked_lists.get(owner, []):
+            if game['game_id'] != game_id:
+                candidates[game['game_id']] = game
+    ranked = sorted(candidates.values(), key=lambda game: game['rating'], reverse=True)[:top_n]
+    return [{'name': game['name'], 'rating': game['rating']} for game in ranked]
+
+
+def refresh_recommendations(db, game_ids=None, rankings=None, batch_size=1000):
+    """Precompute the Game Finder's similar/platform/genre lists into g.recommendations (JSON).
+
+    game_ids=None rebuilds every game; otherwise only the given games are refreshed.
+    """
+    if game_ids is None:
+        game_ids = [row['game_id'] for row in db.read("MATCH (g:Game) RETURN g.game_id AS game_id")]
+    if rankings is None:
+        rankings = load_rankings(db)
+    params = {
+        'similar_rating': LIST_SPECS['similar_games']['min_rating'],
+        'similar_n': LIST_SPECS['similar_games']['top_n']
+    }
+
+    refreshed = 0
+    for batch in batched(game_ids, batch_size):
+        rows = []
+        for game in db.read(GAME_NEIGHBOURS_QUERY, {**params, 'game_ids': batch}):
+            recommendations = {
+                'similar_games': game['similar_games'],
+                'platform_recommendations': pick_from_rankings(
+                    game['game_id'], game['platforms'], rankings['platform'],
+                    LIST_SPECS['platform_recommendations']['top_n']
+                ),
+                'genre_recommendations': pick_from_rankings(
+                    game['game_id'], game['genres'], rankings['genre'],
+                    LIST_SPECS['genre_recommendations']['top_n']
+                )
+            }
+            rows.append({'game_id': game['game_id'], 'recommendations': json.dumps(recommendations)})
+        try:
+            db.write(WRITE_RECOMMENDATIONS_QUERY, {'rows': rows})
+            refreshed += len(rows)
+        except Exception as e:
+            print(f"Failed to store recommendations for {len(rows)} games: {e}")
+
+    print(f"Refreshed recommendations for {refreshed} games")
+    return refreshed
+
+
+def affected_games(db, changed_ids, previous_rankings, current_rankings):
+    """Changed games, games pointing at them, and members of platforms/genres whose ranking moved"""
+    affected = set(changed_ids)
+    affected.update(row['game_id'] for row in db.read("""
+    UNWIND $game_ids AS game_id
+    MATCH (other:Game)-[:SIMILAR_STORY]->(:Game {game_id: game_id})
+    RETURN DISTINCT other.game_id AS game_id
+    """, {'game_ids': changed_ids}))
+
+    relationships = {'platform': 'AVAILABLE_ON', 'genre': 'BELONGS_TO'}
+    for kind, lists in current_rankings.items():
+        previous = previous_rankings.get(kind, {})
+        moved = [name for name in lists if lists[name] != previous.get(name)]
+        if moved:
+            affected.update(row['game_id'] for row in db.read(f"""
+            MATCH (g:Game)-[:{relationships[kind]}]->(owner:{RANKING_SPECS[kind]['label']})
+            WHERE owner.name IN $names
+            RETURN DISTINCT g.game_id AS game_id
+            """, {'names': moved}))
+    return sorted(affected)
+
+
+def refresh_all(db, changed_ids=None):
+    """Re-rank platforms and genres, then rebuild every game's lists or only those affected by changed_ids"""
+    previous = load_rankings(db)
+    rankings = compute_rankings(db)
+    store_rankings(db, rankings)
+    if changed_ids is None:
+        return refresh_recommendations(db, rankings=rankings)
+    return refresh_recommendations(db, affected_games(db, changed_ids, previous, rankings), rankings)
+
+
+if __name__ == "__main__":
+    db = get_neo4j()
+    refresh_all(db, sys.argv[1:] or None)
+    close_neo4j()
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_EPOCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".graph_cache_epoch")
+RETRIEVAL_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", 3600))
+ANALYSIS_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", 6 * 3600))
+
+
+def bump_cache_epoch(path=CACHE_EPOCH_PATH):
+    """Signal every running Game Finder that the graph contents changed"""
+    with open(path, 'w') as f:
+        f.write(str(time.time()))
+
+
+def read_cache_epoch(path=CACHE_EPOCH_PATH):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def normalize_query(query):
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?!. ")
+
+
+class TTLCache:
+    def __init__(self, ttl, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries)
+        }
+
+
+class ResponseCache:
+    """Cross-session cache of retrieval results and curator analyses, keyed by normalized query.
+
+    The analysis key also covers the context it was generated from, so a changed retrieval
+    never serves a stale analysis. Both levels are dropped when the loader or embedding
+    job bumps the epoch file.
+    """
+
+    def __init__(self, retrieval_ttl=RETRIEVAL_TTL, analysis_ttl=ANALYSIS_TTL,
+                 max_entries=512, epoch_path=CACHE_EPOCH_PATH):
+        self.retrieval = TTLCache(retrieval_ttl, max_entries)
+        self.analysis = TTLCache(analysis_ttl, max_entries)
+        self.epoch_path = epoch_path
+        self._epoch = read_cache_epoch(epoch_path)
+
+    def _check_epoch(self):
+        epoch = read_cache_epoch(self.epoch_path)
+        if epoch != self._epoch:
+            self.retrieval.clear()
+            self.analysis.clear()
+            self._epoch = epoch
+
+    @staticmethod
+    def _analysis_key(query, context):
+        return normalize_query(query), hashlib.md5(context.encode()).hexdigest()
+
+    def get_retrieval(self, query):
+        self._check_epoch()
+        return self.retrieval.get(normalize_query(query))
+
+    def put_retrieval(self, query, value):
+        self.retrieval.set(normalize_query(query), value)
+
+    def get_analysis(self, query, context):
+        self._check_epoch()
+        return self.analysis.get(self._analysis_key(query, context))
+
+    def put_analysis(self, query, context, text):
+        self.analysis.set(self._analysis_key(query, context), text)
+
+    def stats(self):
+        return {'retrieval': self.retrieval.stats(), 'analysis': self.analysis.stats()}
@@ -0,0 +1,48 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+
+def top_k_neighbours(matrix, k=10, threshold=0.3, block_size=512, candidates=None):
+    """Yield (row, neighbour, cosine) for each row's k most similar rows above threshold.
+
+    Rows are processed in blocks of `block_size`: one sparse product per block and an
+    argpartition over the block's scores, so peak memory is block_size x n floats
+    rather than the full n x n similarity matrix.
+    """
+    matrix = normalize(sparse.csr_matrix(matrix, dtype=np.float32), norm="l2", copy=False)
+    candidates = matrix if candidates is None else normalize(
+        sparse.csr_matrix(candidates, dtype=np.float32), norm="l2", copy=False
+    )
+    same_space = candidates is matrix
+    candidates_t = candidates.T.tocsc()
+    n_candidates = candidates.shape[0]
+    k = min(k, n_candidates - 1 if same_space else n_candidates)
+    if k <= 0:
+        return
+
+    for start in range(0, matrix.shape[0], block_size):
+        end = min(start + block_size, matrix.shape[0])
+        scores = (matrix[start:end] @ candidates_t).toarray()
+        rows = np.arange(end - start)
+        if same_space:
+            scores[rows, rows + start] = -1.0
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        for offset in rows:
+            keep = top_scores[offset] > threshold
+            for neighbour, score in zip(top[offset][keep], top_scores[offset][keep]):
+                yield start + offset, int(neighbour), float(score)
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
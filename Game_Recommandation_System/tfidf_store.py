@@ -0,0 +1,77 @@
+import os
+import pickle
+import numpy as np
+from scipy import sparse
+
+ARTIFACT_DIR = os.path.dirname(os.path.abspath(__file__))
+VECTORIZER_FILE = "tfidf_vectorizer.pkl"
+MATRIX_FILE = "tfidf_matrix.npz"
+ROWS_FILE = "tfidf_rows.npz"
+METADATA_FILE = "game_metadata.npz"
+
+
+def save_tfidf_artifacts(vectorizer, matrix, game_ids, ratings, oov_rate=None, directory=ARTIFACT_DIR):
+    """Persist the fitted vectorizer, the CSR matrix and the row -> game_id mapping"""
+    with open(os.path.join(directory, VECTORIZER_FILE), 'wb') as f:
+        pickle.dump(vectorizer, f)
+    sparse.save_npz(os.path.join(directory, MATRIX_FILE), sparse.csr_matrix(matrix))
+    np.savez(
+        os.path.join(directory, ROWS_FILE),
+        game_ids=np.array(game_ids, dtype=str),
+        ratings=np.array([np.nan if r is None else r for r in ratings], dtype=float),
+        oov_rate=np.array(np.nan if oov_rate is None else oov_rate)
+    )
+
+
+def load_vectorizer(directory=ARTIFACT_DIR):
+    with open(os.path.join(directory, VECTORIZER_FILE), 'rb') as f:
+        return pickle.load(f)
+
+
+def load_tfidf_artifacts(directory=ARTIFACT_DIR):
+    """Return (vectorizer, csr matrix, game_ids, ratings); row i of the matrix is game_ids[i]"""
+    matrix = sparse.load_npz(os.path.join(directory, MATRIX_FILE)).tocsr()
+    rows = np.load(os.path.join(directory, ROWS_FILE))
+    return load_vectorizer(directory), matrix, rows['game_ids'].tolist(), rows['ratings']
+
+
+def load_baseline_oov_rate(directory=ARTIFACT_DIR):
+    """Out-of-vocabulary rate of the corpus the vectorizer was fitted on"""
+    rows = np.load(os.path.join(directory, ROWS_FILE))
+    return float(rows['oov_rate']) if 'oov_rate' in rows else float('nan')
+
+
+def _pack_strings(values):
+    """Concatenate strings into one UTF-8 buffer plus offsets instead of a fixed-width array"""
+    encoded = [(value or "").encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def save_game_metadata(game_ids, names, summaries, platforms, directory=ARTIFACT_DIR):
+    """Persist display fields for the in-memory index, in the same row order as the matrix"""
+    columns = {'game_ids': np.array(game_ids, dtype=str)}
+    for column, values in (('names', names), ('summaries', summaries), ('platforms', platforms)):
+        columns[f'{column}_data'], columns[f'{column}_offsets'] = _pack_strings(values)
+    np.savez(os.path.join(directory, METADATA_FILE), **columns)
+
+
+def load_game_metadata(directory=ARTIFACT_DIR):
+    """Return {'game_ids': [...], column: (utf-8 buffer, offsets)} for names, summaries and platforms"""
+    stored = np.load(os.path.join(directory, METADATA_FILE))
+    metadata = {'game_ids': stored['game_ids'].tolist()}
+    for column in ('names', 'summaries', 'platforms'):
+        metadata[column] = (stored[f'{column}_data'], stored[f'{column}_offsets'])
+    return metadata
+
+
+def game_metadata_exists(directory=ARTIFACT_DIR):
+    return os.path.exists(os.path.join(directory, METADATA_FILE))
+
+
+def tfidf_artifacts_exist(directory=ARTIFACT_DIR):
+    return all(
+        os.path.exists(os.path.join(directory, name))
+        for name in (VECTORIZER_FILE, MATRIX_FILE, ROWS_FILE)
+    )